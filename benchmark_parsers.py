@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索结果页解析性能测试
+对比各解析后端在已保存的搜索结果页上的耗时，并检查提取结果是否一致
+
+用法:
+    python benchmark_parsers.py baidu saved_pages/*.html
+    python benchmark_parsers.py bing                # 未指定文件时使用生成的测试页面
+"""
+
+import sys
+import time
+
+from html_parsers import available_backends, get_backend
+from search_engines import ENGINE_REGISTRY
+
+
+def build_sample_page(engine, result_count=50):
+    """根据搜索引擎的选择器生成一个测试用的搜索结果页"""
+    def element(selector, content, attrs=''):
+        tag, _, class_name = selector.partition('.')
+        class_attr = f' class="{class_name}"' if class_name else ''
+        return f'<{tag}{class_attr}{attrs}>{content}</{tag}>'
+    
+    selectors = engine.selectors
+    filler = '<div class="ad"><span>推广</span><script>var x = 1;</script></div>' * 5
+    blocks = []
+    for i in range(result_count):
+        title = element(selectors['title'], element(selectors['link'], f'测试结果标题 {i}', f' href="https://example.com/{i}"'))
+        abstract = element(selectors['abstract'], f'这是第 {i} 条结果的摘要内容，<em>关键词</em> 出现在这里。')
+        source = element(selectors['source'], f'example.com/{i}')
+        blocks.append(element(selectors['result'], title + abstract + source) + filler)
+    
+    return f'<html><head><title>测试</title></head><body>{"".join(blocks)}</body></html>'
+
+
+def benchmark(engine, pages, rounds=20):
+    """
+    测试各解析后端
+    
+    Returns:
+        list: (后端名称, 每页平均耗时毫秒, 结果是否与BeautifulSoup一致)
+    """
+    reference = [engine.parse_results(html, 'test', 0, get_backend('bs4')) for html in pages]
+    rows = []
+    
+    for name in available_backends():
+        backend = get_backend(name)
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for html in pages:
+                engine.parse_results(html, 'test', 0, backend)
+        elapsed = (time.perf_counter() - start) / (rounds * len(pages)) * 1000
+        
+        matches = [engine.parse_results(html, 'test', 0, backend) for html in pages] == reference
+        rows.append((name, elapsed, matches))
+    
+    return rows
+
+
+def main():
+    """主函数"""
+    engine_key = sys.argv[1] if len(sys.argv) > 1 else 'baidu'
+    engine = ENGINE_REGISTRY.get(engine_key)
+    if engine is None:
+        print(f"不支持的搜索引擎: {engine_key}")
+        return
+    
+    files = sys.argv[2:]
+    if files:
+        pages = []
+        for path in files:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+        print(f"使用 {len(pages)} 个已保存的 {engine.name} 搜索结果页")
+    else:
+        pages = [build_sample_page(engine)]
+        print(f"未指定页面文件，使用生成的 {engine.name} 测试页面")
+    
+    rows = benchmark(engine, pages)
+    baseline = rows[-1][1]
+    
+    print(f"\n{'后端':<12}{'每页耗时(ms)':>14}{'加速比':>10}  结果一致")
+    for name, elapsed, matches in rows:
+        print(f"{name:<12}{elapsed:>14.2f}{baseline / elapsed:>10.1f}x  {'是' if matches else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网页编码识别
+按 BOM → Content-Type响应头 → <meta charset> → 字节检测 的顺序确定编码，
+检测只作用于页面开头的一小段字节，整个页面只解码一次。
+"""
+
+import codecs
+import re
+
+try:
+    from charset_normalizer import from_bytes
+    CHARSET_NORMALIZER_AVAILABLE = True
+except ImportError:
+    CHARSET_NORMALIZER_AVAILABLE = False
+
+# 只在页面开头这么多字节中查找<meta charset>，与浏览器的做法一致
+META_SNIFF_BYTES = 4096
+
+# 字节检测使用的前缀长度
+DETECT_SNIFF_BYTES = 64 * 1024
+
+# 页面不是UTF-8且charset_normalizer不可用（或没有结果）时依次尝试的编码；
+# gb18030几乎能无错解码任何Big5字节，只靠严格解码分不出两者，所以要先做统计检测
+FALLBACK_ENCODINGS = ['gb18030', 'big5']
+
+HEADER_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+META_CHARSET_RE = re.compile(rb'<meta[^>]+?charset\s*=\s*["\']?\s*([\w.:-]+)', re.IGNORECASE)
+
+BOMS = [
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 网页中常见的编码标签 → Python解码器（GB系列统一用其超集gb18030解码）
+ENCODING_ALIASES = {
+    'gb2312': 'gb18030',
+    'gbk': 'gb18030',
+    'x-gbk': 'gb18030',
+    'gb_2312-80': 'gb18030',
+    'utf8': 'utf-8',
+    'big5-hkscs': 'big5hkscs',
+}
+
+
+def normalize_encoding(label):
+    """把编码标签转换为Python可用的编码名，无法识别时返回None"""
+    if not label:
+        return None
+    label = label.strip().lower()
+    label = ENCODING_ALIASES.get(label, label)
+    try:
+        return codecs.lookup(label).name
+    except LookupError:
+        return None
+
+
+def charset_from_content_type(content_type):
+    """从Content-Type响应头中取出charset参数"""
+    if not content_type:
+        return None
+    match = HEADER_CHARSET_RE.search(content_type)
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def charset_from_meta(body):
+    """从页面开头的<meta charset>或http-equiv声明中取出编码"""
+    match = META_CHARSET_RE.search(body[:META_SNIFF_BYTES])
+    if not match:
+        return None
+    encoding = normalize_encoding(match.group(1).decode('ascii', 'ignore'))
+    # 能读到ASCII的meta声明说明不可能是UTF-16，按HTML规范改用UTF-8
+    if encoding and encoding.startswith('utf-16'):
+        return 'utf-8'
+    return encoding
+
+
+def prefix_decodes(prefix, encoding):
+    """用指定编码严格解码前缀（允许末尾被截断的多字节字符）"""
+    decoder = codecs.getincrementaldecoder(encoding)('strict')
+    try:
+        decoder.decode(prefix, final=False)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def detect_encoding(body):
+    """
+    只根据页面开头的字节判断编码
+    
+    能严格按UTF-8解码时直接使用UTF-8；否则先用charset_normalizer按字符分布做统计检测
+    （可以区分GBK和Big5），检测不可用或没有结果时才依次尝试FALLBACK_ENCODINGS
+    """
+    prefix = body[:DETECT_SNIFF_BYTES]
+    
+    if prefix_decodes(prefix, 'utf-8'):
+        return 'utf-8'
+    
+    if CHARSET_NORMALIZER_AVAILABLE:
+        best = from_bytes(prefix).best()
+        if best is not None:
+            encoding = normalize_encoding(best.encoding)
+            if encoding:
+                return encoding
+    
+    for encoding in FALLBACK_ENCODINGS:
+        if prefix_decodes(prefix, encoding):
+            return encoding
+    
+    return 'latin-1'
+
+
+def sniff_encoding(body, content_type=None):
+    """
+    确定网页编码
+    
+    Args:
+        body (bytes): 响应内容
+        content_type (str): Content-Type响应头
+    
+    Returns:
+        tuple: (编码, 来源)，来源为 'bom'、'header'、'meta' 或 'detect'
+    """
+    for bom, encoding in BOMS:
+        if body.startswith(bom):
+            return encoding, 'bom'
+    
+    encoding = charset_from_content_type(content_type)
+    if encoding:
+        return encoding, 'header'
+    
+    encoding = charset_from_meta(body)
+    if encoding:
+        return encoding, 'meta'
+    
+    return detect_encoding(body), 'detect'
+
+
+def decode_html(body, content_type=None):
+    """
+    解码网页内容（全文只解码一次）
+    
+    Returns:
+        tuple: (文本, 编码, 来源)
+    """
+    encoding, source = sniff_encoding(body, content_type)
+    return body.decode(encoding, errors='replace'), encoding, source
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按主机熔断
+连续失败达到阈值后熔断该主机，冷却期内的请求立即失败而不再等待超时；
+同一次调用的多次重试只计一次失败，一个URL在多次任务中反复失败仍然会熔断；
+冷却结束后只放行一个探测请求，成功则恢复，失败则继续熔断。
+熔断状态保存在磁盘上，下次运行时仍然有效
+"""
+
+import json
+import os
+import time
+import threading
+
+import config
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """主机处于熔断状态，请求被直接拒绝"""
+    
+    def __init__(self, host, retry_in):
+        super().__init__(f"{host} 连续请求失败已熔断，{retry_in:.0f} 秒后再尝试")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class HostCircuitBreaker:
+    """按主机划分的熔断器（线程安全），所有抓取路径共享同一个实例"""
+    
+    def __init__(self, failure_threshold=3, cooldown=600, state_file=None):
+        """
+        初始化熔断器
+        
+        Args:
+            failure_threshold (int): 连续失败多少次后熔断
+            cooldown (float): 熔断后多久放行探测请求（秒）
+            state_file (str): 保存熔断状态的文件，None表示不保存
+        """
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.cooldown = cooldown
+        self.state_file = state_file
+        self.hosts = {}     # 主机 -> {'state', 'failures', 'opened_at', 'failed_keys'}
+        self.probing = set()
+        self.lock = threading.Lock()
+        self._load()
+    
+    @classmethod
+    def from_config(cls):
+        """根据config.py中的配置创建熔断器"""
+        return cls(
+            failure_threshold=config.CIRCUIT_BREAKER_CONFIG['failure_threshold'],
+            cooldown=config.CIRCUIT_BREAKER_CONFIG['cooldown'],
+            state_file=config.CIRCUIT_BREAKER_CONFIG['state_file'],
+        )
+    
+    def before_request(self, host):
+        """
+        请求前调用，主机熔断中时抛出CircuitOpenError
+        
+        冷却结束后第一个请求作为探测请求放行，探测结束前其他请求仍被拒绝
+        """
+        with self.lock:
+            entry = self.hosts.get(host)
+            if entry is None or entry['state'] == CLOSED:
+                return
+            retry_in = entry['opened_at'] + self.cooldown - time.time()
+            if retry_in > 0 or host in self.probing:
+                raise CircuitOpenError(host, max(retry_in, 0))
+            entry['state'] = HALF_OPEN
+            self.probing.add(host)
+    
+    def record_success(self, host):
+        """请求成功"""
+        with self.lock:
+            self.probing.discard(host)
+            entry = self.hosts.pop(host, None)
+            changed = entry is not None and entry['state'] != CLOSED
+        if changed:
+            self._save()
+    
+    def record_failure(self, host, key=None):
+        """
+        请求失败（连接错误、超时、5xx或被拒绝访问）
+        
+        Args:
+            host (str): 主机
+            key: 重试链的标识（见retry_policy.current_attempt_chain），同一key已经计过数时不再计数，
+                这样一次调用的多次重试只算一次失败；None表示每次都计数
+        """
+        with self.lock:
+            was_probe = host in self.probing
+            self.probing.discard(host)
+            entry = self.hosts.setdefault(host, {'state': CLOSED, 'failures': 0, 'opened_at': 0, 'failed_keys': set()})
+            if key is None or key not in entry['failed_keys']:
+                entry['failures'] += 1
+            if key is not None:
+                entry['failed_keys'].add(key)
+            changed = was_probe or (entry['state'] == CLOSED and entry['failures'] >= self.failure_threshold)
+            if changed:
+                entry['state'] = OPEN
+                entry['opened_at'] = time.time()
+                entry['failed_keys'].clear()
+        if changed:
+            self._save()
+    
+    def record_neutral(self, host):
+        """请求结果与主机是否可用无关（如URL本身有误），只结束探测"""
+        with self.lock:
+            self.probing.discard(host)
+            entry = self.hosts.get(host)
+            if entry is not None and entry['state'] == HALF_OPEN:
+                entry['state'] = OPEN
+    
+    def open_hosts(self):
+        """
+        当前处于熔断状态的主机
+        
+        Returns:
+            dict: 主机 -> 距离放行探测请求的秒数
+        """
+        now = time.time()
+        with self.lock:
+            return {
+                host: max(entry['opened_at'] + self.cooldown - now, 0)
+                for host, entry in self.hosts.items() if entry['state'] != CLOSED
+            }
+    
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        for host, opened_at in saved.items():
+            self.hosts[host] = {'state': OPEN, 'failures': self.failure_threshold, 'opened_at': opened_at,
+                                'failed_keys': set()}
+    
+    def _save(self):
+        """只保存熔断中的主机及其熔断时间"""
+        if not self.state_file:
+            return
+        with self.lock:
+            saved = {host: entry['opened_at'] for host, entry in self.hosts.items() if entry['state'] != CLOSED}
+            try:
+                with open(self.state_file + '.tmp', 'w', encoding='utf-8') as f:
+                    json.dump(saved, f, ensure_ascii=False, indent=2)
+                os.replace(self.state_file + '.tmp', self.state_file)
+            except OSError:
+                pass
+
+
+_shared_breaker = None
+_shared_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker():
+    """获取进程内共享的熔断器"""
+    global _shared_breaker
+    with _shared_breaker_lock:
+        if _shared_breaker is None:
+            _shared_breaker = HostCircuitBreaker.from_config()
+        return _shared_breaker
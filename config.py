@@ -10,6 +10,15 @@ SEARCH_ENGINES = {
     'baidu': {
         'name': '百度',
         'url': 'https://www.baidu.com/s',
+        'url_template': 'https://www.baidu.com/s?wd={keyword}&pn={offset}',
+        'page_offset': (0, 10),  # 分页参数：(第一页的值, 每页递增量)
+        'selectors': {           # CSS选择器：结果块，以及结果块内的标题/链接/摘要/来源
+            'result': 'div.result',
+            'title': 'h3',
+            'link': 'a',         # 在标题元素内查找
+            'abstract': 'div.c-abstract',
+            'source': 'div.c-abstract-source',
+        },
         'enabled': True,
         'max_pages': 5,
         'delay_range': (1, 3),  # 请求间隔范围（秒）
@@ -18,6 +27,15 @@ SEARCH_ENGINES = {
     'bing': {
         'name': '必应',
         'url': 'https://www.bing.com/search',
+        'url_template': 'https://www.bing.com/search?q={keyword}&first={offset}',
+        'page_offset': (0, 10),
+        'selectors': {
+            'result': 'li.b_algo',
+            'title': 'h3',
+            'link': 'a',
+            'abstract': 'p',
+            'source': 'cite',
+        },
         'enabled': True,
         'max_pages': 5,
         'delay_range': (1, 3),
@@ -26,6 +44,15 @@ SEARCH_ENGINES = {
     'sogou': {
         'name': '搜狗',
         'url': 'https://www.sogou.com/web',
+        'url_template': 'https://www.sogou.com/web?query={keyword}&page={offset}',
+        'page_offset': (1, 1),
+        'selectors': {
+            'result': 'div.vrwrap',
+            'title': 'h3',
+            'link': 'a',
+            'abstract': 'p.txt',
+            'source': 'cite',
+        },
         'enabled': True,
         'max_pages': 5,
         'delay_range': (1, 3),
@@ -34,6 +61,15 @@ SEARCH_ENGINES = {
     'google': {
         'name': 'Google',
         'url': 'https://www.google.com/search',
+        'url_template': 'https://www.google.com/search?q={keyword}&start={offset}',
+        'page_offset': (0, 10),
+        'selectors': {
+            'result': 'div.g',
+            'title': 'h3',
+            'link': 'a',
+            'abstract': 'div.VwiC3b',
+            'source': 'cite',
+        },
         'enabled': False,  # 默认禁用，需要代理
         'max_pages': 3,
         'delay_range': (2, 5),
@@ -57,6 +93,8 @@ OUTPUT_CONFIG = {
     'encoding': 'utf-8-sig',   # 文件编码
     'include_timestamp': True,  # 文件名是否包含时间戳
     'max_preview_results': 5,   # 预览结果的最大数量
+    'flush_interval': 5,        # 流式写入（csv/jsonl）时定期刷新到磁盘的间隔（秒）
+    'max_file_bytes': 100 * 1024 * 1024,  # 单个输出文件的大小上限，超过后写入下一个分卷，None表示不分卷
 }
 
 # 爬虫行为配置
@@ -66,6 +104,110 @@ CRAWLER_CONFIG = {
     'retry_times': 3,           # 失败重试次数
     'respect_robots_txt': True, # 是否遵守robots.txt
     'random_delay': True,       # 是否使用随机延迟
+    'prefetch_pages': True,     # 解析当前搜索结果页时预先下载下一页（提前停止翻页时可能多请求一页）
+}
+
+# 限速配置（同一主机的请求间隔，搜索引擎使用SEARCH_ENGINES中的delay_range）
+RATE_LIMIT_CONFIG = {
+    'default_delay_range': (1, 2),  # 其他网站的请求间隔范围（秒）
+    'burst': 1,                     # 每个主机允许连续突发的请求数
+}
+
+# 自适应并发配置（每个主机的并发上限：延迟稳定时加性增大，遇到429/503或超时乘性减小）
+CONCURRENCY_CONFIG = {
+    'initial': 2,               # 初始并发上限
+    'min': 1,                   # 并发上限的最小值
+    'max': 16,                  # 并发上限的最大值
+    'latency_tolerance': 2.0,   # 平均延迟不超过基准延迟的多少倍时视为稳定
+    'decrease_factor': 0.5,     # 过载时并发上限乘以的系数
+}
+
+# robots.txt配置（CRAWLER_CONFIG['respect_robots_txt']为True时对直接爬取的网站生效）
+ROBOTS_CONFIG = {
+    'user_agent': '*',          # 匹配规则时使用的User-agent
+    'ttl': 86400,               # 规则缓存时间（秒），每个站点每天只下载一次
+    'error_ttl': 600,           # 下载失败时的缓存时间（秒），期间按允许访问处理
+    'timeout': 10,              # 下载robots.txt的超时时间（秒）
+    'max_crawl_delay': 30,      # Crawl-delay上限（秒）
+}
+
+# 熔断配置（连续失败的主机在冷却期内直接跳过，不再等待超时）
+CIRCUIT_BREAKER_CONFIG = {
+    'enabled': True,                        # 是否启用熔断
+    'failure_threshold': 3,                 # 连续失败多少次后熔断（同一次请求的重试只计一次）
+    'cooldown': 600,                        # 熔断后多久放行一个探测请求（秒）
+    'state_file': '.circuit_breaker.json',  # 熔断状态文件，下次运行时继续生效
+}
+
+# 连接池配置（所有爬虫实例和GUI任务共享，keep-alive连接可跨任务复用）
+SESSION_POOL_CONFIG = {
+    'pool_connections': 100,    # 保留连接池的主机数量
+    'pool_maxsize': 16,         # 每个主机最多保持的连接数（不应小于CONCURRENCY_CONFIG['max']）
+    'pool_block': True,         # 连接用满时等待空闲连接，而不是临时新建连接
+}
+
+# DNS缓存配置（缓存主机名解析结果，长时间运行时不再反复查询DNS）
+DNS_CACHE_CONFIG = {
+    'enabled': True,
+    'ttl': 300,                 # 解析结果缓存时间（秒）
+    'error_ttl': 30,            # 解析失败的缓存时间（秒），0表示不缓存
+}
+
+# 连接预热配置（爬取前并行解析DNS并建立keep-alive连接）
+WARMUP_CONFIG = {
+    'enabled': True,            # 多网站爬取前先预热
+    'workers': 16,              # 并行预热的线程数
+    'timeout': 5,               # 单个网站建立连接的超时时间（秒）
+}
+
+# 页面下载配置
+FETCH_CONFIG = {
+    'max_body_size': 5 * 1024 * 1024,   # 单个页面最多读取的字节数，超出部分丢弃
+    # 允许下载的内容类型，其他类型（图片、PDF、压缩包等）在读取内容前直接放弃
+    'html_content_types': ['text/html', 'application/xhtml+xml', 'application/xml', 'text/xml', 'text/plain'],
+}
+
+# 任务预算配置（每次搜索或网站爬取的上限，用完时返回已获得的部分结果；None表示不限制）
+TASK_BUDGET_CONFIG = {
+    'deadline': 180,                    # 总耗时上限（秒），请求超时时间随剩余时间缩短
+    'max_bytes': 50 * 1024 * 1024,      # 总下载量上限（字节），超出的页面只读取到上限为止
+}
+
+# 解析进程池配置（页面解析在子进程中进行，多网站爬取时利用所有CPU核）
+PARSE_POOL_CONFIG = {
+    'enabled': True,            # False时在下载线程中直接解析
+    'workers': None,            # 解析进程数，None表示CPU核数
+    'start_method': 'spawn',    # 子进程启动方式（spawn不会复制下载线程持有的锁）
+}
+
+# 流水线配置（下载 → 解码 → 解析 → 去重 → 输出，各阶段的线程数和输入队列长度）
+PIPELINE_CONFIG = {
+    'fetch': {'workers': 8, 'queue_size': 32},
+    'decode': {'workers': 2, 'queue_size': 8},
+    'parse': {'workers': None, 'queue_size': 8},    # None表示CPU核数（实际解析在解析进程池中进行）
+    'dedup': {'workers': 1, 'queue_size': 256},
+    'sink': {'workers': 1, 'queue_size': 256},
+}
+
+# 重试配置（重试次数使用CRAWLER_CONFIG['retry_times']）
+RETRY_CONFIG = {
+    'base_delay': 0.5,          # 第一次重试的退避上限（秒），之后每次翻倍并随机取值
+    'max_delay': 10,            # 退避时间上限（秒）
+    'max_retry_after': 60,      # 服务器要求的Retry-After超过该值时放弃重试（秒）
+    'task_budget': 10,          # 单次搜索或单个网站爬取内所有请求的重试总次数上限
+}
+
+# 解析配置
+PARSER_CONFIG = {
+    # 搜索结果页解析后端: 'auto'（selectolax > lxml > BeautifulSoup）、'selectolax'、'lxml'、'bs4'
+    'serp_backend': 'auto',
+}
+
+# HTTP缓存配置（重复爬取同一网站时，未变化的页面只需一次条件请求）
+CACHE_CONFIG = {
+    'enabled': False,           # 是否启用磁盘缓存
+    'cache_dir': '.http_cache', # 缓存目录
+    'max_size_mb': 200,         # 缓存总大小上限（MB），超出时淘汰最久未使用的页面
 }
 
 # 代理配置（如果需要）
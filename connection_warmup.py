@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+连接预热
+在爬取开始前并行解析各网站的DNS并建立keep-alive连接（HTTPS同时完成TLS握手），
+建立好的连接放回共享连接池，第一次请求直接复用，不再承担连接建立的延迟。
+预热只建立连接，不发送HTTP请求
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+import config
+from dns_cache import get_dns_cache, install_dns_cache
+from session_pool import create_session
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _site_urls(urls):
+    """按协议+主机去重，每个站点只预热一次"""
+    sites = {}
+    for url in urls:
+        parts = urlsplit(url)
+        if parts.scheme in DEFAULT_PORTS and parts.hostname:
+            sites.setdefault(f"{parts.scheme}://{parts.netloc.lower()}", url)
+    return list(sites.values())
+
+
+def _get_pool(session, url):
+    """获取session请求url时会使用的urllib3连接池（证书和代理设置与session.get相同）"""
+    adapter = session.get_adapter(url)
+    settings = session.merge_environment_settings(url, {}, None, None, None)
+    if hasattr(adapter, 'get_connection_with_tls_context'):
+        request = requests.Request('GET', url).prepare()
+        return adapter.get_connection_with_tls_context(
+            request, settings['verify'], settings['proxies'], settings['cert'])
+    return adapter.get_connection(url, settings['proxies'])
+
+
+def warm_up_site(session, url, timeout=5):
+    """
+    预热一个站点：解析DNS并建立一个连接放回连接池
+    
+    Returns:
+        dict: {'url', 'ok', 'dns_time', 'connect_time', 'error'}
+    """
+    parts = urlsplit(url)
+    result = {'url': url, 'ok': False, 'dns_time': None, 'connect_time': None, 'error': None}
+    try:
+        start = time.monotonic()
+        get_dns_cache().resolve(parts.hostname, parts.port or DEFAULT_PORTS[parts.scheme])
+        result['dns_time'] = time.monotonic() - start
+        
+        pool = _get_pool(session, url)
+        conn = pool._get_conn(timeout=timeout)
+        try:
+            if conn.sock is None:
+                start = time.monotonic()
+                conn.timeout = timeout
+                conn.connect()
+                result['connect_time'] = time.monotonic() - start
+        except Exception:
+            conn.close()
+            raise
+        finally:
+            pool._put_conn(conn)
+        result['ok'] = True
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def warm_up(urls, session=None, workers=None, timeout=None):
+    """
+    并行预热多个网站
+    
+    Args:
+        urls (list): 网站URL列表（同一站点的多个URL只预热一次）
+        session (requests.Session): 之后用于爬取的Session（连接池按它挂载的adapter选择），
+            默认使用共享连接池
+        workers (int): 并行预热的线程数，默认使用config.WARMUP_CONFIG
+        timeout (float): 单个站点建立连接的超时时间（秒），默认使用config.WARMUP_CONFIG
+    
+    Returns:
+        list: 每个站点的预热结果，见warm_up_site
+    """
+    install_dns_cache()
+    session = session or create_session()
+    workers = workers or config.WARMUP_CONFIG['workers']
+    timeout = timeout or config.WARMUP_CONFIG['timeout']
+    sites = _site_urls(urls)
+    if not sites:
+        return []
+    
+    with ThreadPoolExecutor(max_workers=min(workers, len(sites))) as executor:
+        return list(executor.map(lambda url: warm_up_site(session, url, timeout), sites))
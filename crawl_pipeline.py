@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分阶段爬取流水线
+URL来源 → 下载 → 解码 → 解析提取 → 去重 → 输出，各阶段之间用有界队列连接，
+每个阶段有自己的线程数和队列长度。下游（解析或输出）变慢时队列被填满，
+上游的put会阻塞，下载自动放慢，内存占用不会随待处理页面增长。
+每个阶段统计处理数量、吞吐量、队列深度和因下游阻塞而等待的时间
+"""
+
+import os
+import queue
+import threading
+import time
+
+import config
+
+_DONE = object()    # 阶段结束标记
+
+
+class Stage:
+    """流水线的一个阶段"""
+    
+    def __init__(self, name, func, workers=1, queue_size=16):
+        """
+        初始化阶段
+        
+        Args:
+            name (str): 阶段名称（用于统计输出）
+            func (callable): func(item) 返回交给下一阶段的项目列表（可以为空），
+                返回None表示不向下传递；最后一个阶段的返回值被忽略
+            workers (int): 工作线程数
+            queue_size (int): 输入队列长度上限
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(int(workers), 1)
+        self.queue = queue.Queue(maxsize=max(int(queue_size), 1))
+        self.lock = threading.Lock()
+        self.running = 0
+        self.processed = 0
+        self.emitted = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self.blocked_time = 0.0     # 等待下游队列空位的时间
+        self.max_depth = 0
+    
+    @classmethod
+    def from_config(cls, name, func):
+        """按config.PIPELINE_CONFIG[name]创建阶段，workers为None时使用CPU核数"""
+        stage_config = config.PIPELINE_CONFIG[name]
+        return cls(name, func,
+                   workers=stage_config['workers'] or os.cpu_count() or 1,
+                   queue_size=stage_config['queue_size'])
+    
+    def put(self, item):
+        """放入输入队列（队列已满时阻塞）"""
+        self.queue.put(item)
+        if item is _DONE:
+            # 结束标记总是排在所有项目之后，不计入队列深度
+            return
+        depth = self.queue.qsize()
+        with self.lock:
+            if depth > self.max_depth:
+                self.max_depth = depth
+    
+    def stats(self, elapsed):
+        """
+        阶段统计
+        
+        Args:
+            elapsed (float): 流水线已运行的秒数
+        """
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'processed': self.processed,
+                'emitted': self.emitted,
+                'errors': self.errors,
+                'throughput': round(self.processed / elapsed, 2) if elapsed > 0 else 0.0,
+                'busy_seconds': round(self.busy_time, 3),
+                'blocked_seconds': round(self.blocked_time, 3),
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_depth,
+                'queue_size': self.queue.maxsize,
+            }
+
+
+class CrawlPipeline:
+    """由有界队列连接的多阶段流水线（每个阶段在自己的线程中运行）"""
+    
+    def __init__(self, stages, on_error=None):
+        """
+        初始化流水线
+        
+        Args:
+            stages (list): 按顺序排列的Stage
+            on_error (callable): on_error(stage_name, item, error)，处理单个项目出错时调用，
+                出错的项目被丢弃，流水线继续运行
+        """
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.on_error = on_error
+        self.stop_event = threading.Event()
+        self.started = None
+        self.finished = None
+    
+    def run(self, items):
+        """
+        把items依次送入流水线并等待全部处理完成（每个流水线只运行一次）
+        
+        Args:
+            items (iterable): 第一个阶段的输入（如URL列表）
+        
+        Returns:
+            dict: 各阶段统计，见stats
+        """
+        self.started = time.monotonic()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            next_stage = self.stages[index + 1] if index + 1 < len(self.stages) else None
+            stage.running = stage.workers
+            for number in range(stage.workers):
+                thread = threading.Thread(target=self._work, args=(stage, next_stage),
+                                          name=f"pipeline-{stage.name}-{number}", daemon=True)
+                thread.start()
+                threads.append(thread)
+        
+        first = self.stages[0]
+        try:
+            for item in items:
+                if self.stop_event.is_set():
+                    break
+                first.put(item)
+        finally:
+            for _ in range(first.workers):
+                first.put(_DONE)
+            for thread in threads:
+                thread.join()
+            self.finished = time.monotonic()
+        return self.stats()
+    
+    def stop(self):
+        """停止流水线：不再送入新的项目，队列中剩余的项目直接丢弃"""
+        self.stop_event.set()
+    
+    def _work(self, stage, next_stage):
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                break
+            if self.stop_event.is_set():
+                continue
+            
+            start = time.monotonic()
+            try:
+                outputs = stage.func(item)
+                error = False
+            except Exception as e:
+                outputs = None
+                error = True
+                if self.on_error:
+                    self.on_error(stage.name, item, e)
+            busy = time.monotonic() - start
+            
+            emitted = 0
+            blocked = 0.0
+            if next_stage is not None and outputs:
+                for output in outputs:
+                    start = time.monotonic()
+                    next_stage.put(output)
+                    blocked += time.monotonic() - start
+                    emitted += 1
+            
+            with stage.lock:
+                stage.processed += 1
+                stage.emitted += emitted
+                stage.errors += error
+                stage.busy_time += busy
+                stage.blocked_time += blocked
+        
+        # 本阶段最后一个线程退出时通知下一阶段的所有线程
+        with stage.lock:
+            stage.running -= 1
+            last = stage.running == 0
+        if last and next_stage is not None:
+            for _ in range(next_stage.workers):
+                next_stage.put(_DONE)
+    
+    def stats(self):
+        """
+        各阶段统计
+        
+        Returns:
+            dict: 阶段名称 -> {'workers', 'processed', 'emitted', 'errors', 'throughput'（个/秒）,
+                'busy_seconds', 'blocked_seconds', 'queue_depth', 'max_queue_depth', 'queue_size'}
+        """
+        if self.started is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished or time.monotonic()) - self.started
+        return {stage.name: stage.stats(elapsed) for stage in self.stages}
+
+
+def format_stats(stats):
+    """把CrawlPipeline.stats()的结果格式化为每个阶段一行的文本"""
+    return [
+        f"{name}: 处理 {stage['processed']}，输出 {stage['emitted']}，出错 {stage['errors']}，"
+        f"{stage['throughput']} 个/秒，{stage['workers']} 个线程，"
+        f"队列最大深度 {stage['max_queue_depth']}/{stage['queue_size']}，"
+        f"等待下游 {stage['blocked_seconds']:.1f} 秒"
+        for name, stage in stats.items()
+    ]
@@ -28,7 +28,10 @@ class DependencyChecker:
             'selenium': 'selenium==4.15.2',
             'webdriver-manager': 'webdriver-manager==4.0.1',
             'tqdm': 'tqdm==4.66.1',
-            'colorama': 'colorama==0.4.6'
+            'colorama': 'colorama==0.4.6',
+            'selectolax': 'selectolax==1.0.0',
+            'lxml': 'lxml==4.9.3',
+            'cssselect': 'cssselect==1.2.0'
         }
         
         self.missing_required = []
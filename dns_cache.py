@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内DNS缓存
+缓存socket.getaddrinfo的解析结果（按TTL过期），长时间运行的进程中
+反复访问同一批网站时不再每次都查询DNS；解析失败的结果也会短时间缓存
+"""
+
+import socket
+import time
+import threading
+
+import config
+
+
+class DnsCache:
+    """getaddrinfo结果缓存（线程安全）"""
+    
+    def __init__(self, ttl=300, error_ttl=30, resolver=None):
+        """
+        初始化缓存
+        
+        Args:
+            ttl (float): 解析成功的结果缓存时间（秒）
+            error_ttl (float): 解析失败的结果缓存时间（秒），0表示不缓存失败
+            resolver (callable): 实际执行解析的函数，默认为原始的socket.getaddrinfo
+        """
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.resolver = resolver or socket.getaddrinfo
+        self.entries = {}   # 参数 -> (过期时间, 结果或异常)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls):
+        """根据config.py中的配置创建缓存"""
+        return cls(
+            ttl=config.DNS_CACHE_CONFIG['ttl'],
+            error_ttl=config.DNS_CACHE_CONFIG['error_ttl'],
+        )
+    
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """与socket.getaddrinfo参数和返回值相同，命中缓存时直接返回"""
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                result = entry[1]
+            else:
+                self.misses += 1
+                result = None
+        
+        if result is None:
+            try:
+                result = self.resolver(host, port, family, type, proto, flags)
+                expires = now + self.ttl
+            except socket.gaierror as e:
+                if not self.error_ttl:
+                    raise
+                result = e
+                expires = now + self.error_ttl
+            with self.lock:
+                self.entries[key] = (expires, result)
+        
+        if isinstance(result, socket.gaierror):
+            raise result
+        return list(result)
+    
+    def resolve(self, host, port=None):
+        """
+        解析主机名（预热时使用）
+        
+        Returns:
+            list: 解析得到的IP地址（去重，保持顺序）
+        """
+        infos = self.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        return list(dict.fromkeys(info[4][0] for info in infos))
+    
+    def clear(self):
+        """清空缓存"""
+        with self.lock:
+            self.entries.clear()
+    
+    def stats(self):
+        """缓存命中统计"""
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_dns_cache():
+    """获取进程内共享的DNS缓存"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = DnsCache.from_config()
+        return _shared_cache
+
+
+def install_dns_cache():
+    """
+    按配置用共享DNS缓存替换socket.getaddrinfo（只替换一次）
+    
+    requests/urllib3建立连接时通过socket.getaddrinfo解析主机名，
+    替换后所有连接都使用缓存的解析结果
+    
+    Returns:
+        DnsCache: 已启用的缓存，配置中未启用时返回None
+    """
+    if not config.DNS_CACHE_CONFIG['enabled']:
+        return None
+    cache = get_dns_cache()
+    with _shared_cache_lock:
+        if socket.getaddrinfo != cache.getaddrinfo:
+            socket.getaddrinfo = cache.getaddrinfo
+    return cache
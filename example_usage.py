@@ -48,8 +48,8 @@ def example_web_crawler():
         # 选择搜索引擎
         engines = ['baidu', 'bing']
         
-        # 执行搜索
-        results = crawler.search_all_engines(keyword, max_pages=2, engines=engines)
+        # 执行搜索（各搜索引擎并发执行）
+        results = crawler.search_all_engines(keyword, max_pages=2, engines=engines, concurrent=True)
         
         # 显示结果
         crawler.print_results_summary(results)
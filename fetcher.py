@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+共享抓取层
+所有HTTP请求都经过这里：检查主机是否熔断，（可选）检查robots.txt，占用主机的并发名额（页面内容读取完才释放），再按主机限速，
+请求结束后把耗时和429/503/超时信号反馈给自适应并发控制，把成功/失败反馈给熔断器；
+同一URL的并发页面请求合并为一次下载，共享解码后的内容。
+页面内容以流式方式读取：非HTML内容在读取前直接放弃，内容大小有硬上限，读取的同时计算哈希
+"""
+
+import copy
+import time
+import hashlib
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+import config
+from rate_limiter import HostRateLimiter, get_rate_limiter
+from host_concurrency import get_concurrency_limiter
+from robots_cache import RobotsDisallowed, get_robots_cache
+from circuit_breaker import get_circuit_breaker
+from single_flight import SingleFlightTimeout, get_single_flight, normalize_url
+from charset_sniffer import decode_html
+from http_cache import CachingAdapter
+from task_budget import BudgetExhausted
+from retry_policy import current_attempt_chain
+
+# 表示主机过载的状态码
+OVERLOAD_STATUS_CODES = {429, 503}
+
+# 计入熔断失败次数的状态码（5xx之外，403/429通常表示被网站拦截）
+BLOCKED_STATUS_CODES = {403, 429}
+
+# 流式读取响应内容时每次读取的字节数
+CHUNK_SIZE = 64 * 1024
+
+
+class UnsupportedContentType(Exception):
+    """响应不是HTML页面"""
+    
+    def __init__(self, url, content_type):
+        super().__init__(f"不是HTML页面（{content_type}）: {url}")
+        self.url = url
+        self.content_type = content_type
+
+
+def is_html_content_type(content_type):
+    """Content-Type是否属于允许解析的类型（没有Content-Type时按HTML处理）"""
+    if not content_type:
+        return True
+    media_type = content_type.split(';', 1)[0].strip().lower()
+    return media_type in config.FETCH_CONFIG['html_content_types']
+
+
+def read_body(response, max_bytes=None, stop=None):
+    """
+    流式读取响应内容，最多读取max_bytes字节，读取的同时计算SHA-256
+    
+    Args:
+        response (requests.Response): 以stream=True发送的请求的响应
+        max_bytes (int): 最多读取的字节数，None表示不限制
+        stop (callable): 每读取一块后调用，返回True时停止读取（如已经没有调用方在等待结果）
+    
+    Returns:
+        tuple: (内容, 是否因超出上限或提前停止被截断, 内容的SHA-256十六进制摘要)
+    """
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    truncated = False
+    for chunk in response.iter_content(CHUNK_SIZE):
+        if max_bytes is not None and size + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - size]
+            truncated = True
+        digest.update(chunk)
+        chunks.append(chunk)
+        size += len(chunk)
+        if stop is not None and stop():
+            truncated = True
+        if truncated:
+            break
+    return b''.join(chunks), truncated, digest.hexdigest()
+
+
+def is_timeout(error):
+    """请求是否因超时失败（读取内容时的超时被requests包装为ConnectionError）"""
+    if isinstance(error, requests.exceptions.Timeout):
+        return True
+    return any(isinstance(arg, ReadTimeoutError) for arg in error.args)
+
+
+class FetchedPage:
+    """
+    下载完成的页面
+    
+    文本在第一次访问text/encoding时才解码；只需要原始字节的调用方
+    （如把内容交给解析进程）不会在当前线程中解码
+    """
+    
+    __slots__ = ('url', 'status_code', 'headers', 'content', 'truncated', 'sha256', '_decoded')
+    
+    def __init__(self, response, content, truncated=False, sha256=None):
+        self.url = response.url
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.content = content
+        self.truncated = truncated
+        self.sha256 = sha256
+        self._decoded = None
+    
+    def truncated_to(self, size):
+        """只保留前size字节的副本（任务剩余的字节预算小于页面大小时使用）"""
+        page = copy.copy(self)
+        page.content = self.content[:size]
+        page.truncated = True
+        page.sha256 = hashlib.sha256(page.content).hexdigest()
+        page._decoded = None
+        return page
+    
+    @property
+    def content_type(self):
+        """响应头Content-Type"""
+        return self.headers.get('Content-Type')
+    
+    def _decode(self):
+        # 按响应头、meta声明、字节检测的顺序确定编码，全文只解码一次
+        if self._decoded is None:
+            self._decoded = decode_html(self.content, self.content_type)
+        return self._decoded
+    
+    @property
+    def text(self):
+        """解码后的页面文本"""
+        return self._decode()[0]
+    
+    @property
+    def encoding(self):
+        """解码使用的编码"""
+        return self._decode()[1]
+    
+    @property
+    def encoding_source(self):
+        """编码来源（'bom'、'header'、'meta'或'detect'）"""
+        return self._decode()[2]
+
+
+class Fetcher:
+    """按主机限速和控制并发的请求发送器（线程安全）"""
+    
+    def __init__(self, session, rate_limiter=None, concurrency_limiter=None, respect_robots_txt=None):
+        """
+        初始化抓取器
+        
+        Args:
+            session (requests.Session): 发送请求使用的Session
+            rate_limiter (HostRateLimiter): 限速器，默认使用共享实例
+            concurrency_limiter (HostConcurrencyLimiter): 并发控制器，默认使用共享实例
+            respect_robots_txt (bool): 是否遵守robots.txt，默认使用config.CRAWLER_CONFIG['respect_robots_txt']
+        """
+        self.session = session
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.concurrency_limiter = concurrency_limiter or get_concurrency_limiter()
+        if respect_robots_txt is None:
+            respect_robots_txt = config.CRAWLER_CONFIG['respect_robots_txt']
+        self.robots = get_robots_cache() if respect_robots_txt else None
+        self.breaker = get_circuit_breaker() if config.CIRCUIT_BREAKER_CONFIG['enabled'] else None
+        self.single_flight = get_single_flight()
+    
+    def get(self, url, check_robots=False, budget=None, consume=None, **kwargs):
+        """
+        发送GET请求
+        
+        Args:
+            url (str): 请求地址
+            check_robots (bool): 是否检查robots.txt（启用respect_robots_txt时生效）
+            budget (TaskBudget): 任务预算，等待限速后按剩余时间缩短超时时间
+            consume (callable): consume(response)，在释放并发名额前调用（如读取流式响应的内容），
+                反馈给自适应并发控制的耗时包括consume的执行时间
+            **kwargs: 传给session.get的参数（headers、timeout等）
+        
+        Returns:
+            requests.Response: 响应（不检查状态码）
+        
+        Raises:
+            RobotsDisallowed: robots.txt禁止访问该URL
+            CircuitOpenError: 主机连续失败已熔断
+            BudgetExhausted: 任务预算已用完（包括因预算缩短的超时时间到期）
+        """
+        if budget is not None:
+            budget.check()
+        
+        # 先检查熔断：熔断中的主机不必再等待robots.txt下载超时
+        host = HostRateLimiter.get_host(url)
+        if self.breaker is not None:
+            self.breaker.before_request(host)
+        if check_robots and self.robots is not None and not self.robots.allowed(url):
+            self._record(host, None)
+            raise RobotsDisallowed(url)
+        
+        try:
+            response = self._send(host, url, budget, consume, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self._record(host, False)
+            raise
+        except Exception:
+            self._record(host, None)
+            raise
+        
+        status = response.status_code
+        self._record(host, not (status >= 500 or status in BLOCKED_STATUS_CODES))
+        return response
+    
+    def fetch_page(self, url, check_robots=False, budget=None, **kwargs):
+        """
+        下载并解码页面，非2xx状态码抛出HTTPError
+        
+        同一时刻对同一URL（规范化后）的多次调用只发送一次请求，
+        其余调用等待并共享同一个FetchedPage（或同一个异常）。
+        共享的下载不使用任何调用方的预算：每个调用方只等待到自己预算的截止时间，
+        结果返回后再按自己的剩余字节数截断和计数；所有调用方都超时离开后下载提前停止
+        
+        Args:
+            url (str): 页面地址
+            check_robots (bool): 是否检查robots.txt
+            budget (TaskBudget): 任务预算，最多等待剩余时间，返回的内容不超过剩余字节数
+            **kwargs: 传给session.get的参数（headers、timeout等）
+        
+        页面内容最多读取config.FETCH_CONFIG['max_body_size']字节，超出部分被截断；
+        超出预算剩余字节数的部分同样被截断，这两种情况下FetchedPage.truncated为True
+        
+        Returns:
+            FetchedPage: 解码后的页面
+        
+        Raises:
+            BudgetExhausted: 任务预算在请求前已经用完，或等待下载时用完
+            UnsupportedContentType: 响应不是HTML页面（不读取内容）
+        """
+        if budget is not None:
+            budget.check()
+        key = (normalize_url(url), check_robots)
+        
+        def fetch():
+            body = {}
+            
+            def consume(response):
+                # 内容在并发名额内读取，只读取2xx的HTML响应
+                if response.ok and is_html_content_type(response.headers.get('Content-Type')):
+                    body['result'] = read_body(response, config.FETCH_CONFIG['max_body_size'],
+                                               lambda: not self.single_flight.wanted(key))
+            
+            response = self.get(url, check_robots=check_robots, consume=consume, stream=True, **kwargs)
+            try:
+                response.raise_for_status()
+                content_type = response.headers.get('Content-Type')
+                if not is_html_content_type(content_type):
+                    raise UnsupportedContentType(url, content_type)
+                content, truncated, sha256 = body['result']
+            finally:
+                response.close()
+            if not truncated:
+                self._store_in_cache(url, response, content)
+            return FetchedPage(response, content, truncated, sha256)
+        
+        try:
+            page = self.single_flight.do(key, fetch, budget.remaining_time() if budget is not None else None)
+        except SingleFlightTimeout:
+            raise BudgetExhausted(f"任务时间预算已用完: {url}") from None
+        
+        if budget is not None:
+            remaining = budget.remaining_bytes()
+            if remaining is not None and len(page.content) > remaining:
+                page = page.truncated_to(remaining)
+            budget.add_bytes(len(page.content))
+        return page
+    
+    def _store_in_cache(self, url, response, content):
+        """流式读取的完整响应交给磁盘缓存保存（Session启用了HTTP缓存时）"""
+        adapter = self.session.get_adapter(url)
+        if isinstance(adapter, CachingAdapter):
+            adapter.store(response, content)
+    
+    def _send(self, host, url, budget=None, consume=None, **kwargs):
+        """
+        占用并发名额、限速后发送请求，consume执行完（如内容读取完）才释放名额
+        
+        超时时间被预算缩短后发生的超时说明的是任务没有时间了，而不是主机过载：
+        不反馈给自适应并发控制，抛出BudgetExhausted（熔断器按与主机无关处理）
+        """
+        with self.concurrency_limiter.slot(host) as report:
+            self.rate_limiter.wait(url)
+            limited_by_budget = False
+            if budget is not None:
+                timeout = kwargs.get('timeout')
+                kwargs['timeout'] = budget.timeout(timeout)
+                limited_by_budget = kwargs['timeout'] is not None and (timeout is None or kwargs['timeout'] < timeout)
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+                if consume is not None:
+                    try:
+                        consume(response)
+                    except Exception:
+                        response.close()
+                        raise
+            except requests.exceptions.RequestException as e:
+                if not is_timeout(e):
+                    raise
+                if limited_by_budget:
+                    raise BudgetExhausted(f"任务时间预算已用完: {url}") from e
+                report(overloaded=True)
+                raise
+            report(time.monotonic() - start, response.status_code in OVERLOAD_STATUS_CODES)
+            return response
+    
+    def _record(self, host, success):
+        """
+        把请求结果反馈给熔断器（success为None表示与主机可用性无关）
+        
+        在RetryPolicy.call中发送的请求，同一次调用的多次重试只算一次连续失败
+        """
+        if self.breaker is None:
+            return
+        if success is None:
+            self.breaker.record_neutral(host)
+        elif success:
+            self.breaker.record_success(host)
+        else:
+            self.breaker.record_failure(host, current_attempt_chain())
+    
+    def stats(self):
+        """各主机当前的并发上限、进行中的请求数和平均延迟"""
+        return self.concurrency_limiter.stats()
+    
+    def open_hosts(self):
+        """处于熔断状态的主机 -> 距离放行探测请求的秒数"""
+        return self.breaker.open_hosts() if self.breaker is not None else {}
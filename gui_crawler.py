@@ -136,6 +136,7 @@ class CrawlerGUI:
         # 当前任务状态
         self.is_running = False
         self.current_task = None
+        self.current_pipeline = None
         self.should_stop = False  # 用于控制爬虫停止
         
         # 检查爬虫模块可用性
@@ -1022,11 +1023,26 @@ class CrawlerGUI:
                 self.log_message("❌ 爬虫模块未安装，无法继续")
                 return None
                 
+            import config
             from simple_crawler import SimpleCrawler
+            from crawl_pipeline import format_stats
             crawler = SimpleCrawler()
             
-            # 调用通用网站爬取方法
-            results = crawler.search_website(keyword, website_info['url'], max_pages=pages)
+            # 爬取开始时只预热本次选中的网站（启动时建立的连接等到开始爬取时多半已经过期）
+            if config.WARMUP_CONFIG['enabled']:
+                warm_results = crawler.warm_up_connections([website_info['url']])
+                ready = sum(1 for result in warm_results if result['ok'])
+                self.log_message(f"🔥 连接预热完成: {ready}/{len(warm_results)} 个网站已就绪")
+            
+            # 通过流水线爬取：下载、解码、解析、去重分阶段进行，停止时立即丢弃未处理的页面
+            results = []
+            self.current_pipeline = crawler.build_website_pipeline(keyword, results.append)
+            try:
+                stats = self.current_pipeline.run([website_info['url']])
+            finally:
+                self.current_pipeline = None
+            for line in format_stats(stats):
+                self.log_message(f"📈 {line}")
             
             # 检查是否应该停止
             if self.should_stop:
@@ -1123,39 +1139,23 @@ class CrawlerGUI:
             raise
     
     def generate_csv_output(self, output_dir, filename, results, website_info):
-        """生成CSV输出"""
+        """生成CSV输出（逐条写入，超过大小上限时自动分卷）"""
         try:
-            # 动态导入pandas，避免全局导入错误
-            import pandas as pd
-            
-            # 处理真实的爬虫结果
-            titles = []
-            links = []
-            abstracts = []
-            sources = []
-            timestamps = []
-            
-            for result in results:
-                titles.append(result.get('title', '无标题'))
-                links.append(result.get('link', '无链接'))
-                abstracts.append(result.get('abstract', '无摘要'))
-                sources.append(website_info['name'])
-                timestamps.append(datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-            
-            # 创建DataFrame
-            data = {
-                '标题': titles,
-                '链接': links,
-                '摘要': abstracts,
-                '来源': sources,
-                '爬取时间': timestamps
-            }
+            from result_writers import CsvWriter
             
-            df = pd.DataFrame(data)
-            output_path = os.path.join(output_dir, f"{filename}.csv")
-            df.to_csv(output_path, index=False, encoding='utf-8-sig')
+            fieldnames = ['标题', '链接', '摘要', '来源', '爬取时间']
+            writer = CsvWriter.from_config(os.path.join(output_dir, filename), fieldnames=fieldnames)
+            with writer:
+                for result in results:
+                    writer.write({
+                        '标题': result.get('title', '无标题'),
+                        '链接': result.get('link', '无链接'),
+                        '摘要': result.get('abstract', '无摘要'),
+                        '来源': website_info['name'],
+                        '爬取时间': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    })
             
-            logging.info(f"CSV文件已保存: {output_path}")
+            logging.info(f"CSV文件已保存: {', '.join(writer.paths)}")
             
         except ImportError as e:
             self.log_message(f"⚠️ 无法生成CSV文件: {e}")
@@ -1214,6 +1214,9 @@ class CrawlerGUI:
                     self.status_var.set("正在停止...")
             except Exception:
                 pass
+            pipeline = self.current_pipeline
+            if pipeline:
+                pipeline.stop()
             self.log_message("⏹️ 用户请求停止爬取...")
             logging.info("用户停止爬取任务")
     
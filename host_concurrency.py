@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按主机自适应并发控制（AIMD）
+每个主机维护一个并发上限：响应延迟稳定时加性增大，
+遇到429/503或超时时乘性减小，使并发数逼近主机的实际承受能力而不触发封禁
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+import config
+
+
+class AdaptiveLimit:
+    """单个主机的AIMD并发上限（线程安全）"""
+    
+    def __init__(self, initial=2, min_limit=1, max_limit=16,
+                 latency_tolerance=2.0, decrease_factor=0.5):
+        """
+        初始化并发上限
+        
+        Args:
+            initial (int): 初始并发上限
+            min_limit (int): 并发上限的最小值
+            max_limit (int): 并发上限的最大值
+            latency_tolerance (float): 平均延迟不超过基准延迟的多少倍时视为稳定
+            decrease_factor (float): 过载时并发上限乘以的系数
+        """
+        self.limit = float(initial)
+        self.min_limit = max(int(min_limit), 1)
+        self.max_limit = max(int(max_limit), self.min_limit)
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self.latency = None         # 延迟的指数滑动平均（秒）
+        self.base_latency = None    # 基准延迟（近期最小延迟）
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.condition = threading.Condition()
+    
+    def acquire(self):
+        """阻塞直到正在进行的请求数低于并发上限"""
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+    
+    def release(self, latency=None, overloaded=False):
+        """
+        请求结束后归还并发名额并调整上限
+        
+        Args:
+            latency (float): 本次请求耗时（秒），连接失败等无法计时的情况传None
+            overloaded (bool): 是否收到429/503或请求超时
+        """
+        with self.condition:
+            saturated = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            
+            if overloaded:
+                self._decrease()
+            elif latency is not None:
+                self._observe(latency)
+                # 只有并发名额确实用满且延迟稳定时才增大上限，每个“窗口”约增加1
+                if saturated and self.latency <= self.base_latency * self.latency_tolerance:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            
+            self.condition.notify_all()
+    
+    def _observe(self, latency):
+        if self.latency is None:
+            self.latency = self.base_latency = latency
+            return
+        self.latency += (latency - self.latency) * 0.2
+        if latency < self.base_latency:
+            self.base_latency = latency
+        else:
+            # 基准延迟缓慢上浮，以适应主机本身变慢的情况
+            self.base_latency += (latency - self.base_latency) * 0.01
+    
+    def _decrease(self):
+        # 同一批并发请求往往会一起失败，一个平均延迟内只减小一次
+        now = time.monotonic()
+        if now - self.last_decrease < (self.latency or 1.0):
+            return
+        self.last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+        self.decreases += 1
+    
+    def snapshot(self):
+        """当前状态（用于统计显示）"""
+        with self.condition:
+            return {
+                'limit': int(self.limit),
+                'in_flight': self.in_flight,
+                'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+                'decreases': self.decreases,
+            }
+
+
+class HostConcurrencyLimiter:
+    """按主机划分的自适应并发控制器，所有抓取路径共享同一个实例"""
+    
+    def __init__(self, **limit_options):
+        """
+        初始化并发控制器
+        
+        Args:
+            **limit_options: 传给每个主机AdaptiveLimit的参数
+        """
+        self.limit_options = limit_options
+        self.limits = {}
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls):
+        """根据config.py中的配置创建并发控制器"""
+        return cls(
+            initial=config.CONCURRENCY_CONFIG['initial'],
+            min_limit=config.CONCURRENCY_CONFIG['min'],
+            max_limit=config.CONCURRENCY_CONFIG['max'],
+            latency_tolerance=config.CONCURRENCY_CONFIG['latency_tolerance'],
+            decrease_factor=config.CONCURRENCY_CONFIG['decrease_factor'],
+        )
+    
+    def get_limit(self, host):
+        """获取（必要时创建）主机对应的并发上限"""
+        with self.lock:
+            limit = self.limits.get(host)
+            if limit is None:
+                limit = AdaptiveLimit(**self.limit_options)
+                self.limits[host] = limit
+            return limit
+    
+    @contextmanager
+    def slot(self, host):
+        """
+        占用主机的一个并发名额
+        
+        用法:
+            with limiter.slot(host) as report:
+                ...
+                report(latency, overloaded)
+        未调用report时按连接失败处理（不调整上限）
+        """
+        limit = self.get_limit(host)
+        limit.acquire()
+        outcome = {'latency': None, 'overloaded': False}
+        
+        def report(latency=None, overloaded=False):
+            outcome['latency'] = latency
+            outcome['overloaded'] = overloaded
+        
+        try:
+            yield report
+        finally:
+            limit.release(outcome['latency'], outcome['overloaded'])
+    
+    def stats(self):
+        """
+        各主机当前的并发状态
+        
+        Returns:
+            dict: 主机 -> {'limit', 'in_flight', 'latency_ms', 'decreases'}
+        """
+        with self.lock:
+            limits = list(self.limits.items())
+        return {host: limit.snapshot() for host, limit in limits}
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_concurrency_limiter():
+    """获取进程内共享的并发控制器"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostConcurrencyLimiter.from_config()
+        return _shared_limiter
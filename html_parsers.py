@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTML解析后端
+为搜索结果提取提供统一的解析接口，支持selectolax、lxml和BeautifulSoup。
+快速后端为可选依赖，未安装时自动使用BeautifulSoup。
+"""
+
+import soupsieve
+from bs4 import BeautifulSoup
+
+import config
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+try:
+    import lxml.html
+    from lxml import etree
+    from cssselect import HTMLTranslator
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+class SoupBackend:
+    """BeautifulSoup后端（最慢，但兼容性最好，作为兜底）"""
+    
+    name = 'bs4'
+    
+    def compile(self, selector):
+        """预编译CSS选择器"""
+        return soupsieve.compile(selector)
+    
+    def parse(self, html):
+        """解析HTML文档"""
+        return BeautifulSoup(html, 'html.parser')
+    
+    def select(self, node, compiled):
+        """查找node的所有匹配后代"""
+        return compiled.select(node)
+    
+    def select_one(self, node, compiled):
+        """查找node的第一个匹配后代"""
+        return compiled.select_one(node)
+    
+    def text(self, node):
+        """获取节点文本（与get_text(strip=True)一致）"""
+        return node.get_text(strip=True)
+    
+    def attr(self, node, name):
+        """获取节点属性"""
+        return node.get(name) or ''
+
+
+class LxmlBackend:
+    """lxml后端（需要lxml和cssselect）"""
+    
+    name = 'lxml'
+    
+    def __init__(self):
+        self.translator = HTMLTranslator()
+        self.text_xpath = etree.XPath('.//text()[not(ancestor::script) and not(ancestor::style)]')
+    
+    def compile(self, selector):
+        return etree.XPath(self.translator.css_to_xpath(selector, prefix='descendant::'))
+    
+    def parse(self, html):
+        # 以字节形式解析，避免带编码声明的文档被lxml拒绝；
+        # lxml的解析器对象不能跨线程共享，因此每次新建
+        parser = lxml.html.HTMLParser(encoding='utf-8')
+        return lxml.html.document_fromstring(html.encode('utf-8'), parser=parser)
+    
+    def select(self, node, compiled):
+        return compiled(node)
+    
+    def select_one(self, node, compiled):
+        matches = compiled(node)
+        return matches[0] if matches else None
+    
+    def text(self, node):
+        return ''.join(text.strip() for text in self.text_xpath(node))
+    
+    def attr(self, node, name):
+        return node.get(name) or ''
+
+
+class SelectolaxBackend:
+    """selectolax后端（基于lexbor，速度最快）"""
+    
+    name = 'selectolax'
+    
+    def compile(self, selector):
+        # selectolax直接接收选择器字符串
+        return selector
+    
+    def parse(self, html):
+        tree = LexborHTMLParser(html)
+        # BeautifulSoup的get_text不包含脚本和样式内容，这里保持一致
+        tree.strip_tags(['script', 'style'])
+        return tree
+    
+    def select(self, node, compiled):
+        # selectolax的css()包含节点自身，这里只保留后代
+        node_id = getattr(node, 'mem_id', None)
+        return [match for match in node.css(compiled) if match.mem_id != node_id]
+    
+    def select_one(self, node, compiled):
+        matches = self.select(node, compiled)
+        return matches[0] if matches else None
+    
+    def text(self, node):
+        return node.text(deep=True, separator='', strip=True)
+    
+    def attr(self, node, name):
+        return node.attributes.get(name) or ''
+
+
+BACKEND_CLASSES = {
+    'selectolax': (SelectolaxBackend, SELECTOLAX_AVAILABLE),
+    'lxml': (LxmlBackend, LXML_AVAILABLE),
+    'bs4': (SoupBackend, True),
+}
+
+# backend='auto' 时按此顺序选择第一个可用的后端
+AUTO_ORDER = ['selectolax', 'lxml', 'bs4']
+
+_backends = {}
+
+
+def available_backends():
+    """返回当前环境可用的后端名称列表"""
+    return [name for name in AUTO_ORDER if BACKEND_CLASSES[name][1]]
+
+
+def get_backend(name=None):
+    """
+    获取解析后端实例
+    
+    Args:
+        name (str): 'auto'、'selectolax'、'lxml' 或 'bs4'，
+            默认使用config.PARSER_CONFIG['serp_backend']
+    
+    Returns:
+        解析后端实例；请求的后端不可用时返回BeautifulSoup后端
+    """
+    if name is None:
+        name = config.PARSER_CONFIG.get('serp_backend', 'auto')
+    if name == 'auto':
+        name = available_backends()[0]
+    if name not in BACKEND_CLASSES or not BACKEND_CLASSES[name][1]:
+        name = 'bs4'
+    
+    if name not in _backends:
+        _backends[name] = BACKEND_CLASSES[name][0]()
+    return _backends[name]
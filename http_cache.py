@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+磁盘HTTP缓存
+以requests适配器的形式挂载到Session上：按URL保存响应内容，
+再次请求时带上If-None-Match / If-Modified-Since，服务器返回304时直接使用磁盘中的内容。
+缓存总大小有上限，超出时按最近最少使用（LRU）淘汰。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import config
+from session_pool import mount_adapter, pool_options
+
+# 这些响应头描述的是传输格式，缓存中保存的是解压后的内容，因此不保存它们
+SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+class DiskCache:
+    """按URL保存响应内容的磁盘缓存（线程安全）"""
+    
+    def __init__(self, cache_dir, max_size):
+        """
+        初始化缓存
+        
+        Args:
+            cache_dir (str): 缓存目录
+            max_size (int): 缓存内容总大小上限（字节）
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = {}   # 键 -> [最近访问时间, 内容大小]
+        self.total_size = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+    
+    @staticmethod
+    def make_key(url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+    
+    def _paths(self, key):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.body', base + '.json'
+    
+    def _load_index(self):
+        """启动时扫描缓存目录，以内容文件的修改时间作为最近访问时间"""
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.body'):
+                continue
+            key = filename[:-len('.body')]
+            body_path, meta_path = self._paths(key)
+            if not os.path.exists(meta_path):
+                continue
+            stat = os.stat(body_path)
+            self.entries[key] = [stat.st_mtime, stat.st_size]
+            self.total_size += stat.st_size
+    
+    def get(self, url):
+        """
+        读取缓存
+        
+        Returns:
+            tuple: (元数据, 内容)，不存在时返回 (None, None)
+        """
+        key = self.make_key(url)
+        body_path, meta_path = self._paths(key)
+        with self.lock:
+            if key not in self.entries:
+                return None, None
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                with open(body_path, 'rb') as f:
+                    body = f.read()
+            except (OSError, ValueError):
+                self._remove(key)
+                return None, None
+            self._touch(key)
+        return meta, body
+    
+    def get_meta(self, url):
+        """只读取元数据（用于构造条件请求）"""
+        key = self.make_key(url)
+        with self.lock:
+            if key not in self.entries:
+                return None
+            try:
+                with open(self._paths(key)[1], 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                return None
+    
+    def set(self, url, meta, body):
+        """写入缓存，必要时淘汰最久未使用的条目"""
+        if len(body) > self.max_size:
+            return
+        key = self.make_key(url)
+        body_path, meta_path = self._paths(key)
+        with self.lock:
+            self._remove(key)
+            # 先写临时文件再改名，避免中断时留下不完整的缓存
+            with open(body_path + '.tmp', 'wb') as f:
+                f.write(body)
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+            os.replace(body_path + '.tmp', body_path)
+            os.replace(meta_path + '.tmp', meta_path)
+            self.entries[key] = [time.time(), len(body)]
+            self.total_size += len(body)
+            self._evict()
+    
+    def _touch(self, key):
+        now = time.time()
+        self.entries[key][0] = now
+        try:
+            os.utime(self._paths(key)[0], (now, now))
+        except OSError:
+            pass
+    
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_size -= entry[1]
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+    
+    def _evict(self):
+        if self.total_size <= self.max_size:
+            return
+        for key, _ in sorted(self.entries.items(), key=lambda item: item[1][0]):
+            if self.total_size <= self.max_size:
+                break
+            self._remove(key)
+
+
+class CachingAdapter(HTTPAdapter):
+    """带条件请求缓存的HTTP适配器（只缓存GET请求）"""
+    
+    def __init__(self, cache, *args, **kwargs):
+        self.cache = cache
+        super().__init__(*args, **kwargs)
+    
+    def send(self, request, stream=False, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, stream=stream, **kwargs)
+        
+        meta = self.cache.get_meta(request.url)
+        if meta:
+            if meta.get('etag'):
+                request.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request.headers['If-Modified-Since'] = meta['last_modified']
+        
+        response = super().send(request, stream=stream, **kwargs)
+        
+        if response.status_code == 304 and meta:
+            response.close()
+            cached_meta, body = self.cache.get(request.url)
+            if body is not None:
+                return self._build_cached_response(request, cached_meta, body)
+            # 缓存在此期间被淘汰，重新发送不带条件的请求
+            request.headers.pop('If-None-Match', None)
+            request.headers.pop('If-Modified-Since', None)
+            response = super().send(request, stream=stream, **kwargs)
+        
+        response.from_cache = False
+        # 流式读取的响应在调用方读完内容后通过store()保存
+        if not stream:
+            self.store(response, response.content)
+        return response
+    
+    def store(self, response, body):
+        """保存带有ETag或Last-Modified的200响应"""
+        if response.status_code != 200 or getattr(response, 'from_cache', False):
+            return
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            self.cache.set(response.request.url, {
+                'url': response.request.url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'headers': {
+                    name: value for name, value in response.headers.items()
+                    if name.lower() not in SKIPPED_HEADERS
+                },
+            }, body)
+    
+    def _build_cached_response(self, request, meta, body):
+        """用缓存内容构造一个200响应"""
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(meta.get('headers', {}))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """获取按config.CACHE_CONFIG创建的进程内共享缓存"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = DiskCache(
+                config.CACHE_CONFIG['cache_dir'],
+                config.CACHE_CONFIG['max_size_mb'] * 1024 * 1024,
+            )
+        return _shared_cache
+
+
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+
+def get_caching_adapter():
+    """获取使用共享缓存和共享连接池参数的缓存适配器"""
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            _shared_adapter = CachingAdapter(get_http_cache(), **pool_options())
+        return _shared_adapter
+
+
+def install_http_cache(session, cache=None):
+    """
+    为Session启用磁盘缓存
+    
+    Args:
+        session (requests.Session): 要启用缓存的Session
+        cache (DiskCache): 缓存实例，默认使用共享缓存（连接池也在所有Session之间共享）
+    """
+    if cache is None:
+        adapter = get_caching_adapter()
+    else:
+        adapter = CachingAdapter(cache, **pool_options())
+    return mount_adapter(session, adapter)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多关键词匹配
+Aho-Corasick自动机：一次扫描文本即可找出所有关键词的所有出现位置，
+扫描耗时与关键词数量基本无关。
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """Aho-Corasick多模式匹配自动机"""
+    
+    def __init__(self, keywords):
+        """
+        构建自动机
+        
+        Args:
+            keywords (list): 关键词列表（区分大小写，需要忽略大小写时请先转为小写）
+        """
+        self.keywords = list(keywords)
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self.transitions[state].get(char)
+                if next_state is None:
+                    next_state = len(self.transitions)
+                    self.transitions[state][char] = next_state
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                state = next_state
+            self.outputs[state].append(keyword_id)
+        
+        self._build_fail_links()
+    
+    def _build_fail_links(self):
+        """按广度优先顺序计算失败指针，并合并输出"""
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+    
+    def find_all(self, text):
+        """
+        查找所有匹配
+        
+        Returns:
+            list: (起始位置, 关键词编号) 列表，按结束位置排序
+        """
+        transitions = self.transitions
+        fail = self.fail
+        outputs = self.outputs
+        keywords = self.keywords
+        matches = []
+        state = 0
+        
+        for position, char in enumerate(text):
+            while state and char not in transitions[state]:
+                state = fail[state]
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                for keyword_id in outputs[state]:
+                    matches.append((position - len(keywords[keyword_id]) + 1, keyword_id))
+        
+        return matches
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+网页关键词提取
+为SimpleCrawler.search_website提供单次遍历的提取逻辑：
+先一次性建立页面索引（每个元素的文本区间、父子和兄弟关系），
+再在索引上完成标题、段落、链接和表格的关键词匹配。
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+from bs4 import BeautifulSoup
+from bs4.element import CData, NavigableString, Tag
+
+from keyword_matcher import AhoCorasick
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+TITLE_TAGS = HEADING_TAGS + ('title', 'a')
+PARAGRAPH_TAGS = ('p', 'div', 'span')
+
+# element_matches中结果的分组顺序
+TITLE_RESULT, PARAGRAPH_RESULT, LINK_RESULT, TABLE_RESULT = range(4)
+
+# 与BeautifulSoup的get_text()一致：只统计普通文本，不包含注释、脚本、样式等
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+
+class ElementInfo:
+    """索引中的一个元素（按文档顺序编号）"""
+    
+    __slots__ = ('tag', 'name', 'order', 'end', 'str_start', 'str_end',
+                 'parent', 'next_sibling', 'last_child')
+    
+    def __init__(self, tag, name, order, str_start, parent=None):
+        self.tag = tag
+        self.name = name
+        self.order = order          # 文档顺序编号
+        self.end = order + 1        # 子树中最后一个元素的编号 + 1
+        self.str_start = str_start  # 文本片段区间 [str_start, str_end)
+        self.str_end = str_start
+        self.parent = parent
+        self.next_sibling = None    # 下一个兄弟元素（跳过文本节点）
+        self.last_child = None
+
+
+class PageIndex:
+    """
+    页面索引
+    
+    遍历一次文档，把所有文本片段按顺序保存下来，
+    每个元素只记录自己覆盖的片段区间，元素文本和关键词匹配都通过区间计算，
+    不再对每个元素重复调用get_text()。
+    """
+    
+    def __init__(self, soup):
+        self.soup = soup
+        self.strings = []
+        self.lower_strings = []
+        self.elements = []
+        self.elements_by_name = {}
+        self._build()
+        
+        self.full_text = ''.join(self.strings)
+        self.full_lower = ''.join(self.lower_strings)
+        self.offsets = self._cumulative_lengths(self.strings)
+        self.lower_offsets = self._cumulative_lengths(self.lower_strings)
+        self.orders_by_name = {
+            name: [info.order for info in infos]
+            for name, infos in self.elements_by_name.items()
+        }
+        self.hit_starts = []
+        self.hit_ends = []
+        self.hit_ids = []
+        self.keyword_count = 0
+        
+        # 标题索引：文档顺序排列的h1-h6，用于二分查找"前面最近的标题"
+        self.headings = [info for info in self.elements if info.name in HEADING_TAGS]
+        self.heading_orders = [info.order for info in self.headings]
+    
+    @staticmethod
+    def _cumulative_lengths(strings):
+        offsets = [0]
+        total = 0
+        for text in strings:
+            total += len(text)
+            offsets.append(total)
+        return offsets
+    
+    def _build(self):
+        """用显式栈遍历文档（避免深层嵌套页面触发递归限制）"""
+        root = ElementInfo(self.soup, self.soup.name, -1, 0)
+        self.root = root
+        stack = [(root, iter(self.soup.contents))]
+        
+        while stack:
+            info, children = stack[-1]
+            for child in children:
+                if isinstance(child, Tag):
+                    child_info = ElementInfo(child, child.name, len(self.elements),
+                                             len(self.strings), info)
+                    if info.last_child is not None:
+                        info.last_child.next_sibling = child_info
+                    info.last_child = child_info
+                    self.elements.append(child_info)
+                    self.elements_by_name.setdefault(child.name, []).append(child_info)
+                    stack.append((child_info, iter(child.contents)))
+                    break
+                if type(child) in TEXT_STRING_TYPES:
+                    text = child.strip()
+                    if text:
+                        self.strings.append(text)
+                        self.lower_strings.append(text.lower())
+            else:
+                info.end = len(self.elements)
+                info.str_end = len(self.strings)
+                stack.pop()
+    
+    def text(self, info):
+        """元素文本，等同于get_text(strip=True)"""
+        return self.full_text[self.offsets[info.str_start]:self.offsets[info.str_end]]
+    
+    def text_length(self, info):
+        """元素文本长度（不需要生成字符串）"""
+        return self.offsets[info.str_end] - self.offsets[info.str_start]
+    
+    def find_keywords(self, keywords_lower):
+        """
+        在小写全文中一次性定位所有关键词（允许重叠），之后用matched_keywords查询
+        
+        单个关键词直接用str.find，多个关键词用Aho-Corasick自动机只扫描一遍
+        """
+        if len(keywords_lower) == 1:
+            keyword_lower = keywords_lower[0]
+            hits = []
+            if keyword_lower:
+                index = self.full_lower.find(keyword_lower)
+                while index != -1:
+                    hits.append((index, 0))
+                    index = self.full_lower.find(keyword_lower, index + 1)
+        else:
+            hits = sorted(AhoCorasick(keywords_lower).find_all(self.full_lower))
+        
+        self.keyword_count = len(keywords_lower)
+        self.hit_starts = [start for start, _ in hits]
+        self.hit_ends = [start + len(keywords_lower[keyword_id]) for start, keyword_id in hits]
+        self.hit_ids = [keyword_id for _, keyword_id in hits]
+    
+    def matched_keywords(self, info):
+        """元素文本（忽略大小写）中出现的关键词编号列表（按编号排序）"""
+        start = self.lower_offsets[info.str_start]
+        end = self.lower_offsets[info.str_end]
+        matched = set()
+        i = bisect_left(self.hit_starts, start)
+        while i < len(self.hit_starts) and self.hit_starts[i] < end:
+            if self.hit_ends[i] <= end:
+                matched.add(self.hit_ids[i])
+                if len(matched) == self.keyword_count:
+                    break
+            i += 1
+        return sorted(matched)
+    
+    def find_first(self, info, names):
+        """元素子树中第一个指定名称的后代，等同于tag.find(names)"""
+        best = None
+        for name in names:
+            orders = self.orders_by_name.get(name)
+            if not orders:
+                continue
+            i = bisect_right(orders, info.order)
+            if i < len(orders) and orders[i] < info.end:
+                candidate = self.elements_by_name[name][i]
+                if best is None or candidate.order < best.order:
+                    best = candidate
+        return best
+    
+    def preceding_heading(self, info):
+        """文档中位于元素之前最近的标题，等同于tag.find_previous(['h1', ..., 'h6'])"""
+        i = bisect_left(self.heading_orders, info.order)
+        return self.headings[i - 1] if i > 0 else None
+    
+    def count(self, names):
+        """指定名称的元素数量"""
+        return sum(len(self.orders_by_name.get(name, ())) for name in names)
+
+
+def parse_html(html_content):
+    """依次尝试多种解析器解析网页"""
+    parsers_to_try = ['html.parser', 'lxml', 'html5lib']
+    
+    for parser in parsers_to_try:
+        try:
+            soup = BeautifulSoup(html_content, parser)
+            print(f"✅ 使用解析器 {parser} 成功")
+            return soup
+        except Exception as e:
+            print(f"❌ 解析器 {parser} 失败: {e}")
+            continue
+    
+    raise Exception("所有解析器都失败了")
+
+
+def absolute_link(link_url, website_url):
+    """把相对链接补全为绝对链接"""
+    if link_url and not link_url.startswith('http'):
+        if link_url.startswith('/'):
+            return website_url.rstrip('/') + link_url
+        return website_url.rstrip('/') + '/' + link_url
+    return link_url
+
+
+def make_result(title, link, abstract, website_url, keywords, tag_keywords=False):
+    """
+    构造一条直接爬取结果
+    
+    Args:
+        keywords (list): 匹配到的关键词
+        tag_keywords (bool): 是否附加matched_keywords字段（多关键词模式）
+    """
+    result = {
+        'title': title,
+        'link': link,
+        'abstract': abstract,
+        'source': website_url,
+        'search_engine': '直接爬取',
+        'keyword': ', '.join(keywords),
+        'page': 1
+    }
+    if tag_keywords:
+        result['matched_keywords'] = list(keywords)
+    return result
+
+
+def nearby_abstract(index, info):
+    """元素后面紧邻的段落，或父元素中的第一个段落"""
+    next_elem = info.next_sibling
+    if next_elem is not None and next_elem.name == 'p':
+        return index.text(next_elem)
+    if info.parent is not None:
+        parent_para = index.find_first(info.parent, ('p',))
+        if parent_para is not None:
+            return index.text(parent_para)
+    return ''
+
+
+def script_matches(index, keywords, website_url, tag_keywords=False):
+    """在JavaScript代码中查找关键词（每个关键词取第一次出现的上下文）"""
+    return list(iter_script_matches(index, keywords, website_url, tag_keywords))
+
+
+def iter_script_matches(index, keywords, website_url, tag_keywords=False):
+    """script_matches的生成器版本"""
+    keywords_lower = [keyword.lower() for keyword in keywords]
+    matcher = AhoCorasick(keywords_lower) if len(keywords) > 1 else None
+    
+    for info in index.elements_by_name.get('script', ()):
+        script_content = info.tag.string
+        if not script_content:
+            continue
+        script_lower = script_content.lower()
+        
+        if matcher is None:
+            first_positions = {0: script_lower.find(keywords_lower[0])}
+        else:
+            first_positions = {}
+            for position, keyword_id in matcher.find_all(script_lower):
+                first_positions.setdefault(keyword_id, position)
+        
+        for keyword_id in sorted(first_positions):
+            keyword_index = first_positions[keyword_id]
+            if keyword_index == -1:
+                continue
+            print(f"✅ 在JavaScript中找到关键词")
+            start = max(0, keyword_index - 100)
+            end = min(len(script_content), keyword_index + 100)
+            yield make_result("JavaScript中的关键词内容", website_url,
+                              script_content[start:end], website_url,
+                              [keywords[keyword_id]], tag_keywords)
+
+
+def table_abstract(table):
+    """表格前3行的摘要"""
+    table_summary = []
+    for row in table.find_all('tr')[:3]:
+        cells = row.find_all(['td', 'th'])
+        row_text = ' | '.join([cell.get_text(strip=True) for cell in cells])
+        if row_text:
+            table_summary.append(row_text)
+    return ' | '.join(table_summary)
+
+
+def element_matches(index, keywords, website_url, tag_keywords=False):
+    """
+    一次遍历索引，同时产生标题、段落、链接和表格候选结果
+    
+    Args:
+        index (PageIndex): 页面索引
+        keywords (list): 关键词列表，每条结果记录其中匹配到的关键词
+        website_url (str): 网站地址
+        tag_keywords (bool): 是否附加matched_keywords字段
+    
+    Returns:
+        list: 按 标题、段落、链接、表格 的顺序排列的结果
+    """
+    groups = ([], [], [], [])
+    for kind, result in _iter_element_candidates(index, keywords, website_url, tag_keywords):
+        groups[kind].append(result)
+    title_results, paragraph_results, link_results, table_results = groups
+    return title_results + paragraph_results + link_results + table_results
+
+
+def iter_element_matches(index, keywords, website_url, tag_keywords=False):
+    """element_matches的生成器版本，结果按元素在文档中的顺序产生（不按类型分组）"""
+    for _, result in _iter_element_candidates(index, keywords, website_url, tag_keywords):
+        yield result
+
+
+def _iter_element_candidates(index, keywords, website_url, tag_keywords):
+    """遍历索引，按文档顺序产生 (结果类型, 结果)"""
+    index.find_keywords([keyword.lower() for keyword in keywords])
+    
+    for info in index.elements:
+        name = info.name
+        length = index.text_length(info)
+        is_title = name in TITLE_TAGS and length > 2
+        is_paragraph = name in PARAGRAPH_TAGS and 15 < length < 500
+        is_link = name == 'a' and 2 < length < 100
+        is_table = name == 'table'
+        
+        # 先按长度筛选，只有可能产生结果的元素才做关键词匹配
+        if not (is_title or is_paragraph or is_link or is_table):
+            continue
+        matched = [keywords[keyword_id] for keyword_id in index.matched_keywords(info)]
+        if not matched:
+            continue
+        
+        # 标题元素
+        if is_title:
+            title_text = index.text(info)
+            print(f"✅ 在标题中找到关键词: {title_text[:50]}...")
+            link_url = ''
+            if name == 'a' and info.tag.get('href'):
+                link_url = info.tag['href']
+            else:
+                link = index.find_first(info, ('a',))
+                if link is not None and link.tag.get('href'):
+                    link_url = link.tag['href']
+            yield TITLE_RESULT, make_result(title_text, absolute_link(link_url, website_url),
+                                            nearby_abstract(index, info), website_url, matched, tag_keywords)
+        
+        # 段落元素（避免过长的内容）
+        if is_paragraph:
+            p_text = index.text(info)
+            print(f"✅ 在段落中找到关键词: {p_text[:50]}...")
+            title = ''
+            prev_elem = index.preceding_heading(info)
+            if prev_elem is not None:
+                title = index.text(prev_elem)
+            elif info.parent is not None:
+                parent_title = index.find_first(info.parent, HEADING_TAGS)
+                if parent_title is not None:
+                    title = index.text(parent_title)
+            
+            link_url = ''
+            link = index.find_first(info, ('a',))
+            if link is not None and link.tag.get('href'):
+                link_url = absolute_link(link.tag['href'], website_url)
+            
+            yield PARAGRAPH_RESULT, make_result(
+                title or "包含关键词的段落", link_url,
+                p_text[:200] + '...' if len(p_text) > 200 else p_text,
+                website_url, matched, tag_keywords)
+        
+        # 链接文本（避免过长的链接文本）
+        if is_link:
+            link_text = index.text(info)
+            print(f"✅ 在链接中找到关键词: {link_text[:50]}...")
+            link_url = absolute_link(info.tag.get('href', ''), website_url)
+            yield LINK_RESULT, make_result(link_text, link_url, nearby_abstract(index, info),
+                                           website_url, matched, tag_keywords)
+        
+        # 表格
+        if is_table:
+            print(f"✅ 在表格中找到关键词")
+            caption = index.find_first(info, ('caption',))
+            title = index.text(caption) if caption is not None else "包含关键词的表格"
+            yield TABLE_RESULT, make_result(title, '', table_abstract(info.tag),
+                                            website_url, matched, tag_keywords)
+
+
+def content_key(result):
+    """去重使用的键：标题和摘要前50个字符的组合"""
+    return f"{result['title']}_{result['abstract'][:50]}"
+
+
+def deduplicate(results):
+    """基于标题和摘要的组合去重（多关键词模式下合并重复结果的关键词）"""
+    unique_results = []
+    seen_content = {}
+    for result in results:
+        key = content_key(result)
+        kept = seen_content.get(key)
+        if kept is None:
+            unique_results.append(result)
+            seen_content[key] = result
+        elif 'matched_keywords' in kept:
+            for keyword in result['matched_keywords']:
+                if keyword not in kept['matched_keywords']:
+                    kept['matched_keywords'].append(keyword)
+            kept['keyword'] = ', '.join(kept['matched_keywords'])
+    return unique_results
+
+
+def fuzzy_matches(all_text, keyword, website_url, tag_keywords=False):
+    """未找到精确匹配时，在页面全文中查找关键词或关键词前缀的上下文"""
+    results = []
+    all_text_lower = all_text.lower()
+    
+    if keyword.lower() in all_text_lower:
+        print("✅ 页面确实包含关键词，尝试提取上下文...")
+        keyword_index = all_text_lower.find(keyword.lower())
+        start = max(0, keyword_index - 100)
+        end = min(len(all_text), keyword_index + 100)
+        results.append(make_result("包含关键词的页面内容", website_url,
+                                   all_text[start:end], website_url, [keyword], tag_keywords))
+        print("✅ 通过模糊搜索找到相关内容")
+        return results
+    
+    print("❌ 页面中确实没有找到关键词")
+    
+    # 尝试搜索关键词的部分字符
+    print("🔍 尝试搜索关键词的部分字符...")
+    for i in range(len(keyword), 1, -1):
+        partial_keyword = keyword[:i]
+        keyword_index = all_text_lower.find(partial_keyword.lower())
+        if keyword_index != -1:
+            print(f"✅ 找到部分关键词: {partial_keyword}")
+            start = max(0, keyword_index - 100)
+            end = min(len(all_text), keyword_index + 100)
+            results.append(make_result(f"包含部分关键词'{partial_keyword}'的页面内容", website_url,
+                                       all_text[start:end], website_url, [keyword], tag_keywords))
+            break
+    
+    return results
+
+
+def build_page_index(html_content):
+    """解析网页并建立索引，同时输出页面结构信息"""
+    soup = parse_html(html_content)
+    index = PageIndex(soup)
+    
+    # 调试：检查页面基本结构
+    print(f"🔍 页面标题: {soup.title.get_text() if soup.title else '无标题'}")
+    print(f"🔍 找到的标题标签数量: {index.count(HEADING_TAGS)}")
+    print(f"🔍 找到的段落标签数量: {index.count(('p',))}")
+    print(f"🔍 找到的链接标签数量: {index.count(('a',))}")
+    print(f"🔍 找到的div标签数量: {index.count(('div',))}")
+    print(f"🔍 找到的span标签数量: {index.count(('span',))}")
+    
+    return index
+
+
+def extract_keyword_matches(html_content, keyword, website_url):
+    """
+    从网页内容中提取包含关键词的结果
+    
+    Args:
+        html_content (str): 网页HTML
+        keyword (str): 搜索关键词
+        website_url (str): 网站地址（用于补全相对链接）
+    
+    Returns:
+        list: 去重后的结果
+    """
+    index = build_page_index(html_content)
+    
+    results = script_matches(index, [keyword], website_url)
+    results.extend(element_matches(index, [keyword], website_url))
+    print(f"🔍 初步搜索完成，找到 {len(results)} 个结果")
+    
+    unique_results = deduplicate(results)
+    print(f"🔍 去重后剩余 {len(unique_results)} 个结果")
+    
+    # 如果没有找到结果，尝试更宽松的搜索
+    if not unique_results:
+        print("⚠️ 未找到精确匹配，尝试模糊搜索...")
+        all_text = index.soup.get_text()
+        print(f"🔍 页面总文本长度: {len(all_text)} 字符")
+        unique_results = fuzzy_matches(all_text, keyword, website_url)
+    
+    print(f"🎯 最终结果数量: {len(unique_results)}")
+    return unique_results
+
+
+def iter_keyword_matches(html_content, keyword, website_url):
+    """
+    extract_keyword_matches的生成器版本：每找到一条不重复的结果就立即产生
+    
+    页面解析和建立索引完成后开始产生结果，不再等全部结果收集、去重完毕；
+    结果按 JavaScript、页面元素（文档顺序）排列。去重键（content_key）与extract_keyword_matches相同，
+    得到的去重键集合也相同，但extract_keyword_matches先按标题、段落、链接、表格分组再去重，
+    多条结果去重键相同时保留下来的可能是另一条（如链接不同）
+    
+    Yields:
+        dict: 去重后的结果
+    """
+    index = build_page_index(html_content)
+    
+    seen = set()
+    candidates = chain(iter_script_matches(index, [keyword], website_url),
+                       iter_element_matches(index, [keyword], website_url))
+    for result in candidates:
+        key = content_key(result)
+        if key not in seen:
+            seen.add(key)
+            yield result
+    
+    # 如果没有找到结果，尝试更宽松的搜索
+    if not seen:
+        print("⚠️ 未找到精确匹配，尝试模糊搜索...")
+        yield from fuzzy_matches(index.soup.get_text(), keyword, website_url)
+
+
+def extract_multi_keyword_matches(html_content, keywords, website_url):
+    """
+    一次解析、一次匹配，提取包含任一关键词的结果
+    
+    Args:
+        html_content (str): 网页HTML
+        keywords (list): 关键词列表
+        website_url (str): 网站地址（用于补全相对链接）
+    
+    Returns:
+        list: 去重后的结果，每条结果的matched_keywords字段列出匹配到的关键词
+    """
+    # 忽略大小写去除重复的关键词
+    unique_keywords = []
+    seen_keywords = set()
+    for keyword in keywords:
+        if keyword and keyword.lower() not in seen_keywords:
+            unique_keywords.append(keyword)
+            seen_keywords.add(keyword.lower())
+    if not unique_keywords:
+        return []
+    
+    index = build_page_index(html_content)
+    
+    results = script_matches(index, unique_keywords, website_url, tag_keywords=True)
+    results.extend(element_matches(index, unique_keywords, website_url, tag_keywords=True))
+    print(f"🔍 初步搜索完成，找到 {len(results)} 个结果")
+    
+    unique_results = deduplicate(results)
+    print(f"🔍 去重后剩余 {len(unique_results)} 个结果")
+    
+    # 对没有任何结果的关键词做模糊搜索
+    found_keywords = set()
+    for result in unique_results:
+        found_keywords.update(result['matched_keywords'])
+    missing_keywords = [keyword for keyword in unique_keywords if keyword not in found_keywords]
+    
+    if missing_keywords:
+        print(f"⚠️ {len(missing_keywords)} 个关键词未找到精确匹配，尝试模糊搜索...")
+        all_text = index.soup.get_text()
+        for keyword in missing_keywords:
+            unique_results.extend(fuzzy_matches(all_text, keyword, website_url, tag_keywords=True))
+    
+    print(f"🎯 最终结果数量: {len(unique_results)}")
+    return unique_results
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+解析进程池
+页面解析（BeautifulSoup建树、遍历）是CPU密集型操作，在线程中执行时受GIL限制只能用到一个核。
+下载线程把原始字节交给解析进程，在子进程中完成解码和提取，只把结果字典传回主进程，
+多网站爬取时解析可以分布到所有CPU核上。
+未启用或进程池不可用时在当前线程中解析，结果相同
+"""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+from charset_sniffer import decode_html
+from page_extractor import extract_keyword_matches, extract_multi_keyword_matches
+from search_engines import get_engine
+
+
+def extract_website(content, content_type, keywords, website_url, multi=False, sniffed=None):
+    """
+    解码网站页面并提取包含关键词的结果（在解析进程中执行）
+    
+    Args:
+        content (bytes): 页面原始内容
+        content_type (str): 响应头Content-Type
+        keywords (list): 关键词列表
+        website_url (str): 网站地址（用于补全相对链接）
+        multi (bool): 是否按多关键词方式提取（结果带matched_keywords字段）
+        sniffed (tuple): 已经确定的(编码, 编码来源)（如流水线的解码阶段），None表示在这里确定
+    
+    Returns:
+        tuple: (结果列表, 编码, 编码来源)
+    """
+    if sniffed is None:
+        text, encoding, encoding_source = decode_html(content, content_type)
+    else:
+        encoding, encoding_source = sniffed
+        text = content.decode(encoding, errors='replace')
+    if multi:
+        results = extract_multi_keyword_matches(text, keywords, website_url)
+    else:
+        results = extract_keyword_matches(text, keywords[0], website_url)
+    return results, encoding, encoding_source
+
+
+def parse_search_page(engine_key, html, keyword, page):
+    """解析搜索结果页（在解析进程中执行）"""
+    return get_engine(engine_key).parse_results(html, keyword, page)
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_parse_pool():
+    """
+    获取进程内共享的解析进程池
+    
+    Returns:
+        ProcessPoolExecutor: 解析进程池，配置中未启用时返回None
+    """
+    global _shared_pool
+    if not config.PARSE_POOL_CONFIG['enabled']:
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            start_method = config.PARSE_POOL_CONFIG['start_method']
+            _shared_pool = ProcessPoolExecutor(
+                max_workers=config.PARSE_POOL_CONFIG['workers'],
+                mp_context=multiprocessing.get_context(start_method) if start_method else None,
+            )
+        return _shared_pool
+
+
+def _discard_pool(pool):
+    """进程池损坏（如子进程被杀死）时丢弃，下次使用时重新创建"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is pool:
+            _shared_pool = None
+    pool.shutdown(wait=False)
+
+
+def run_parse(func, *args):
+    """
+    在解析进程池中执行func并等待结果（供下载线程调用）
+    
+    未启用进程池或进程池损坏时在当前线程中执行
+    """
+    pool = get_parse_pool()
+    if pool is not None:
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            _discard_pool(pool)
+    return func(*args)
+
+
+async def run_parse_async(func, *args, executor=None):
+    """
+    run_parse的协程版本
+    
+    Args:
+        executor: 未启用进程池时执行func的线程池，None表示事件循环的默认线程池
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_parse_pool()
+    if pool is not None:
+        try:
+            return await loop.run_in_executor(pool, func, *args)
+        except BrokenProcessPool:
+            _discard_pool(pool)
+    return await loop.run_in_executor(executor, func, *args)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按主机限速模块
+每个主机一个令牌桶，保证同一主机的请求之间有最小间隔，
+不同主机之间互不影响，可在多线程中共享使用
+"""
+
+import time
+import random
+import threading
+from urllib.parse import urlparse
+
+import config
+
+
+class TokenBucket:
+    """带随机抖动的令牌桶（线程安全）"""
+    
+    def __init__(self, interval, jitter=0.0, burst=1):
+        """
+        初始化令牌桶
+        
+        Args:
+            interval (float): 两次请求之间的最小间隔（秒）
+            jitter (float): 需要等待时额外增加的随机延迟上限（秒）
+            burst (int): 允许连续突发的请求数
+        """
+        self.interval = max(float(interval), 0.0)
+        self.jitter = max(float(jitter), 0.0)
+        self.burst = max(int(burst), 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def reserve(self):
+        """
+        预约一个令牌，返回需要等待的秒数
+        
+        令牌在锁内预先扣除（可以变为负数），因此并发线程会依次排队，
+        且后续请求的等待时间会把前一个请求的抖动计算在内。
+        """
+        if self.interval <= 0:
+            return 0.0
+        
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) / self.interval)
+            self.updated = now
+            
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            
+            delay = random.uniform(0, self.jitter) if self.jitter else 0.0
+            wait = (1 - self.tokens) * self.interval + delay
+            self.tokens -= 1 + delay / self.interval
+            return wait
+    
+    def acquire(self):
+        """阻塞直到可以发送请求，返回实际等待的秒数"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """按主机划分的限速器，所有抓取路径共享同一个实例"""
+    
+    def __init__(self, default_delay_range=(1, 2), burst=1, random_delay=True):
+        """
+        初始化限速器
+        
+        Args:
+            default_delay_range (tuple): 未单独配置的主机使用的请求间隔范围（秒）
+            burst (int): 每个主机允许连续突发的请求数
+            random_delay (bool): 是否在最小间隔之上增加随机抖动
+        """
+        self.default_delay_range = default_delay_range
+        self.burst = burst
+        self.random_delay = random_delay
+        self.host_delay_ranges = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls):
+        """根据config.py中的配置创建限速器"""
+        limiter = cls(
+            default_delay_range=config.RATE_LIMIT_CONFIG['default_delay_range'],
+            burst=config.RATE_LIMIT_CONFIG['burst'],
+            random_delay=config.CRAWLER_CONFIG.get('random_delay', True),
+        )
+        for engine_config in config.SEARCH_ENGINES.values():
+            host = cls.get_host(engine_config['url'])
+            limiter.configure_host(host, engine_config['delay_range'])
+        return limiter
+    
+    @staticmethod
+    def get_host(url):
+        """从URL中提取主机名（包含端口）"""
+        return urlparse(url).netloc.lower()
+    
+    def configure_host(self, host, delay_range):
+        """为指定主机设置请求间隔范围"""
+        with self.lock:
+            self.host_delay_ranges[host.lower()] = delay_range
+            self.buckets.pop(host.lower(), None)
+    
+    def set_min_delay(self, host, delay):
+        """保证主机的请求间隔不小于delay秒（用于robots.txt中的Crawl-delay）"""
+        host = host.lower()
+        with self.lock:
+            min_delay, max_delay = self.host_delay_ranges.get(host, self.default_delay_range)
+            if delay <= min_delay:
+                return
+            self.host_delay_ranges[host] = (delay, delay + max_delay - min_delay)
+            self.buckets.pop(host, None)
+    
+    def get_bucket(self, host):
+        """获取（必要时创建）主机对应的令牌桶"""
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                min_delay, max_delay = self.host_delay_ranges.get(host, self.default_delay_range)
+                jitter = max_delay - min_delay if self.random_delay else 0.0
+                bucket = TokenBucket(min_delay, jitter, self.burst)
+                self.buckets[host] = bucket
+            return bucket
+    
+    def wait(self, url):
+        """在请求url之前调用，阻塞到该主机允许下一次请求为止"""
+        return self.get_bucket(self.get_host(url)).acquire()
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """获取进程内共享的限速器"""
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            _shared_limiter = HostRateLimiter.from_config()
+        return _shared_limiter
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式结果写入
+结果逐条追加到JSON Lines或CSV文件，不需要先把全部结果放进列表或DataFrame，
+无论任务产生多少结果，内存占用都保持不变。
+缓冲区按时间间隔定期刷新到磁盘；文件超过大小上限时自动切换到下一个分卷
+"""
+
+import codecs
+import csv
+import io
+import json
+import os
+import threading
+
+import config
+
+# CSV的默认列顺序（第一条结果中的其他字段排在后面）
+DEFAULT_FIELDS = ['title', 'link', 'abstract', 'source', 'search_engine', 'keyword', 'page']
+
+
+class StreamingWriter:
+    """逐条追加写入结果的文件写入器（线程安全，可作为流水线的输出函数）"""
+    
+    extension = ''
+    
+    def __init__(self, filename, encoding='utf-8', flush_interval=5.0, max_file_bytes=None):
+        """
+        初始化写入器（第一条结果写入时才创建文件）
+        
+        Args:
+            filename (str): 文件名（不含扩展名）
+            encoding (str): 文件编码
+            flush_interval (float): 定期刷新缓冲区的间隔（秒），None表示只在关闭时刷新
+            max_file_bytes (int): 单个文件的大小上限（字节），超过后切换到下一个分卷，None表示不分卷
+        """
+        self.filename = filename
+        self.encoding = encoding
+        # 统计文件大小时不重复计算utf-8-sig每次编码都会加上的BOM
+        self.size_encoding = 'utf-8' if codecs.lookup(encoding).name == 'utf-8-sig' else encoding
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.paths = []         # 已创建的文件
+        self.count = 0          # 已写入的结果数
+        self.file = None
+        self.file_bytes = 0
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.flusher = None
+    
+    @classmethod
+    def from_config(cls, filename, **kwargs):
+        """创建写入器，未指定的参数使用config.OUTPUT_CONFIG中的默认值"""
+        kwargs.setdefault('flush_interval', config.OUTPUT_CONFIG['flush_interval'])
+        kwargs.setdefault('max_file_bytes', config.OUTPUT_CONFIG['max_file_bytes'])
+        return cls(filename, **kwargs)
+    
+    def write(self, record):
+        """写入一条结果"""
+        with self.lock:
+            if self.closed.is_set():
+                raise ValueError("写入器已关闭")
+            data = self.format_record(record)
+            size = len(data.encode(self.size_encoding))
+            if self.file is not None and self.max_file_bytes and self.file_bytes + size > self.max_file_bytes:
+                self._close_file()
+            if self.file is None:
+                self._open_file()
+            self.file.write(data)
+            self.file_bytes += size
+            self.count += 1
+    
+    def write_all(self, records):
+        """
+        依次写入多条结果（records可以是生成器）
+        
+        Returns:
+            int: 本次写入的结果数
+        """
+        written = 0
+        for record in records:
+            self.write(record)
+            written += 1
+        return written
+    
+    def flush(self):
+        """把缓冲区写入磁盘"""
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+    
+    def close(self):
+        """刷新并关闭文件"""
+        self.closed.set()
+        with self.lock:
+            if self.file is not None:
+                self._close_file()
+        if self.flusher is not None:
+            self.flusher.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def format_record(self, record):
+        """把一条结果转换为要写入的文本"""
+        raise NotImplementedError
+    
+    def header(self):
+        """每个文件开头写入的内容"""
+        return ''
+    
+    def _open_file(self):
+        part = len(self.paths)
+        suffix = f".{part}" if part else ''
+        path = f"{self.filename}{suffix}{self.extension}"
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'w', encoding=self.encoding, newline='')
+        self.paths.append(path)
+        data = self.header()
+        self.file.write(data)
+        self.file_bytes = len(data.encode(self.size_encoding))
+        
+        if self.flush_interval and self.flusher is None:
+            self.flusher = threading.Thread(target=self._flush_periodically, daemon=True)
+            self.flusher.start()
+    
+    def _close_file(self):
+        self.file.close()
+        self.file = None
+    
+    def _flush_periodically(self):
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+
+
+class JsonLinesWriter(StreamingWriter):
+    """JSON Lines写入器：每行一条JSON格式的结果"""
+    
+    extension = '.jsonl'
+    
+    def format_record(self, record):
+        return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+class CsvWriter(StreamingWriter):
+    """CSV写入器：列由fieldnames或第一条结果决定，每个分卷都带表头"""
+    
+    extension = '.csv'
+    
+    def __init__(self, filename, encoding='utf-8-sig', fieldnames=None, **kwargs):
+        """
+        Args:
+            fieldnames (list): CSV列，None表示按DEFAULT_FIELDS和第一条结果的字段确定；
+                之后结果中多出的字段被忽略，缺少的字段留空
+            其他参数同StreamingWriter
+        """
+        super().__init__(filename, encoding=encoding, **kwargs)
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self.buffer = io.StringIO()
+        self.writer = None
+    
+    def format_record(self, record):
+        if self.fieldnames is None:
+            self.fieldnames = [field for field in DEFAULT_FIELDS if field in record]
+            self.fieldnames += [field for field in record if field not in self.fieldnames]
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.buffer, fieldnames=self.fieldnames,
+                                         extrasaction='ignore', lineterminator='\n')
+        row = {
+            field: ', '.join(map(str, value)) if isinstance(value, (list, tuple)) else value
+            for field, value in record.items()
+        }
+        return self._render(lambda: self.writer.writerow(row))
+    
+    def header(self):
+        return self._render(self.writer.writeheader)
+    
+    def _render(self, write):
+        """用csv模块生成一行文本（保证转义规则与csv模块一致）"""
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        write()
+        return self.buffer.getvalue()
+
+
+WRITER_CLASSES = {
+    'jsonl': JsonLinesWriter,
+    'csv': CsvWriter,
+}
+
+
+def open_writer(filename, format, **kwargs):
+    """
+    按格式创建流式写入器
+    
+    Args:
+        filename (str): 文件名（不含扩展名）
+        format (str): 'jsonl' 或 'csv'
+        **kwargs: 传给写入器的参数，未指定的使用config.OUTPUT_CONFIG中的默认值
+    
+    Raises:
+        ValueError: 不支持的格式
+    """
+    writer_class = WRITER_CLASSES.get(format.lower())
+    if writer_class is None:
+        raise ValueError(f"不支持流式写入的格式: {format}")
+    if writer_class is CsvWriter:
+        kwargs.setdefault('encoding', config.OUTPUT_CONFIG['encoding'])
+    return writer_class.from_config(filename, **kwargs)
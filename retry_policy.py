@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求重试策略
+指数退避 + 完全随机抖动（full jitter），服务器返回Retry-After时按其要求等待；
+只重试网络错误、超时和 429/5xx 等暂时性错误，并用每个任务的重试预算限制总重试次数
+"""
+
+import time
+import random
+import threading
+import contextvars
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+import config
+
+# 可以重试的HTTP状态码（其余4xx说明请求本身有问题，重试无意义）
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# 可以重试的网络错误（SSL错误虽然是ConnectionError的子类，但重试通常无济于事）
+RETRYABLE_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+    ConnectionError,
+    TimeoutError,
+)
+FATAL_ERRORS = (
+    requests.exceptions.SSLError,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.MissingSchema,
+    requests.exceptions.InvalidSchema,
+)
+
+
+# 当前正在执行的重试链：一次call的所有尝试共用同一个标识
+_attempt_chain = contextvars.ContextVar('attempt_chain', default=None)
+
+
+def current_attempt_chain():
+    """
+    当前正在执行的RetryPolicy.call的标识（熔断器据此把同一次调用的多次重试合并为一次失败）
+    
+    Returns:
+        object: 本次调用的所有尝试都相同的标识，不在RetryPolicy.call中时返回None
+    """
+    return _attempt_chain.get()
+
+
+class RetryBudget:
+    """一个任务内所有请求共享的重试次数预算（线程安全）"""
+    
+    def __init__(self, max_retries):
+        self.remaining = max(int(max_retries), 0)
+        self.lock = threading.Lock()
+    
+    def consume(self):
+        """消耗一次重试机会，预算用完时返回False"""
+        with self.lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+def parse_retry_after(value):
+    """
+    解析Retry-After响应头
+    
+    Returns:
+        float: 需要等待的秒数，无法解析时返回None
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RetryPolicy:
+    """请求重试策略"""
+    
+    def __init__(self, retry_times=3, base_delay=0.5, max_delay=10.0,
+                 max_retry_after=60.0, task_budget=10, retryable_errors=()):
+        """
+        初始化重试策略
+        
+        Args:
+            retry_times (int): 单个请求失败后的最大重试次数
+            base_delay (float): 第一次重试的退避上限（秒），之后每次翻倍
+            max_delay (float): 退避时间上限（秒）
+            max_retry_after (float): 服务器要求的Retry-After超过该值时不再重试（秒）
+            task_budget (int): 单个任务（一次搜索或一次网站爬取）内所有请求的重试总次数上限
+            retryable_errors (tuple): 额外需要重试的异常类型（如Selenium的超时异常）
+        """
+        self.retry_times = max(int(retry_times), 0)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.task_budget = task_budget
+        self.retryable_errors = RETRYABLE_ERRORS + tuple(retryable_errors)
+    
+    @classmethod
+    def from_config(cls, **kwargs):
+        """根据config.py中的配置创建重试策略"""
+        return cls(
+            retry_times=config.CRAWLER_CONFIG['retry_times'],
+            base_delay=config.RETRY_CONFIG['base_delay'],
+            max_delay=config.RETRY_CONFIG['max_delay'],
+            max_retry_after=config.RETRY_CONFIG['max_retry_after'],
+            task_budget=config.RETRY_CONFIG['task_budget'],
+            **kwargs
+        )
+    
+    def new_budget(self):
+        """为一个新任务创建重试预算"""
+        return RetryBudget(self.task_budget)
+    
+    def is_retryable(self, error):
+        """判断异常是否属于暂时性错误"""
+        if isinstance(error, FATAL_ERRORS):
+            return False
+        if isinstance(error, requests.exceptions.HTTPError):
+            response = error.response
+            return response is not None and response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, self.retryable_errors)
+    
+    def backoff(self, attempt):
+        """第attempt次重试（从0开始）前的退避时间：在[0, min(上限, 基数×2^attempt)]中随机取值"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    def get_delay(self, attempt, error):
+        """
+        计算重试前的等待时间
+        
+        Returns:
+            float: 等待秒数，服务器要求的等待时间过长时返回None（放弃重试）
+        """
+        delay = self.backoff(attempt)
+        response = getattr(error, 'response', None)
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                delay = max(delay, retry_after)
+        return delay
+    
+    def call(self, func, budget=None, on_retry=None, task_budget=None):
+        """
+        执行func，遇到暂时性错误时按策略重试
+        
+        Args:
+            func (callable): 无参数的请求函数
+            budget (RetryBudget): 任务的重试预算，None表示不限制
+            on_retry (callable): on_retry(attempt, error, delay)，每次重试前调用（attempt从1开始）
+            task_budget (TaskBudget): 任务的时间预算，等待时间超过剩余时间时不再重试
+        
+        Returns:
+            func的返回值；重试次数用完或遇到不可重试的错误时抛出最后一次的异常
+        
+        同一次调用的所有尝试共用一个重试链标识，见current_attempt_chain
+        """
+        token = _attempt_chain.set(object())
+        try:
+            return self._call(func, budget, on_retry, task_budget)
+        finally:
+            _attempt_chain.reset(token)
+    
+    def _call(self, func, budget, on_retry, task_budget):
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                if attempt >= self.retry_times or not self.is_retryable(e):
+                    raise
+                delay = self.get_delay(attempt, e)
+                if delay is None:
+                    raise
+                remaining = task_budget.remaining_time() if task_budget is not None else None
+                if remaining is not None and delay >= remaining:
+                    raise
+                if budget is not None and not budget.consume():
+                    raise
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(attempt, e, delay)
+                time.sleep(delay)
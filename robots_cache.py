@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+robots.txt缓存
+每个站点的robots.txt只下载一次，解析后的规则按TTL缓存（默认一天），
+下载失败或不存在时也会缓存结果，避免每次请求都多一次往返；
+Crawl-delay会同步到按主机限速的最小间隔中
+"""
+
+import time
+import threading
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+import config
+from rate_limiter import get_rate_limiter
+from session_pool import create_session
+
+
+class RobotsDisallowed(Exception):
+    """robots.txt禁止访问该URL"""
+    
+    def __init__(self, url):
+        super().__init__(f"robots.txt禁止访问: {url}")
+        self.url = url
+
+
+class RobotsRules:
+    """一个站点的robots.txt规则及其过期时间"""
+    
+    __slots__ = ('parser', 'expires', 'crawl_delay')
+    
+    def __init__(self, parser, expires, crawl_delay=None):
+        self.parser = parser
+        self.expires = expires
+        self.crawl_delay = crawl_delay
+
+
+class RobotsCache:
+    """按站点缓存robots.txt规则（线程安全，同一站点并发查询时只下载一次）"""
+    
+    def __init__(self, user_agent='*', ttl=86400, error_ttl=600, timeout=10,
+                 max_crawl_delay=30, rate_limiter=None):
+        """
+        初始化缓存
+        
+        Args:
+            user_agent (str): 匹配robots.txt规则时使用的User-agent
+            ttl (float): 成功下载（或确认不存在）的规则缓存时间（秒）
+            error_ttl (float): 下载失败时的缓存时间（秒），期间按允许访问处理
+            timeout (float): 下载robots.txt的超时时间（秒）
+            max_crawl_delay (float): Crawl-delay的上限（秒），防止个别站点设置过大的值
+            rate_limiter (HostRateLimiter): 接收Crawl-delay的限速器，默认使用共享实例
+        """
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.timeout = timeout
+        self.max_crawl_delay = max_crawl_delay
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.session = create_session()
+        self.entries = {}
+        self.pending = {}
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls):
+        """根据config.py中的配置创建缓存"""
+        return cls(
+            user_agent=config.ROBOTS_CONFIG['user_agent'],
+            ttl=config.ROBOTS_CONFIG['ttl'],
+            error_ttl=config.ROBOTS_CONFIG['error_ttl'],
+            timeout=config.ROBOTS_CONFIG['timeout'],
+            max_crawl_delay=config.ROBOTS_CONFIG['max_crawl_delay'],
+        )
+    
+    def allowed(self, url):
+        """判断robots.txt是否允许访问url"""
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return True
+        rules = self.get_rules(parsed.scheme, parsed.netloc.lower())
+        return rules is None or rules.parser.can_fetch(self.user_agent, url)
+    
+    def get_rules(self, scheme, netloc):
+        """
+        获取站点规则，过期或不存在时下载
+        
+        同一站点同时只有一个线程下载，其他线程等待下载结果
+        """
+        site = f"{scheme}://{netloc}"
+        while True:
+            with self.lock:
+                rules = self.entries.get(site)
+                if rules is not None and rules.expires > time.monotonic():
+                    return rules
+                event = self.pending.get(site)
+                if event is None:
+                    event = threading.Event()
+                    self.pending[site] = event
+                    break
+            event.wait()
+        
+        rules = None
+        try:
+            rules = self._download(site)
+        finally:
+            with self.lock:
+                if rules is not None:
+                    self.entries[site] = rules
+                del self.pending[site]
+            event.set()
+        
+        if rules.crawl_delay:
+            self.rate_limiter.set_min_delay(netloc, rules.crawl_delay)
+        return rules
+    
+    def _download(self, site):
+        """下载并解析robots.txt"""
+        parser = RobotFileParser(f"{site}/robots.txt")
+        try:
+            response = self.session.get(parser.url, timeout=self.timeout)
+        except requests.exceptions.RequestException:
+            parser.parse([])
+            return RobotsRules(parser, time.monotonic() + self.error_ttl)
+        
+        if response.status_code >= 500:
+            # 服务器暂时出错：短时间内按允许访问处理，稍后重新下载
+            parser.parse([])
+            return RobotsRules(parser, time.monotonic() + self.error_ttl)
+        
+        # 4xx表示没有robots.txt，全部允许
+        parser.parse(response.text.splitlines() if response.status_code == 200 else [])
+        crawl_delay = parser.crawl_delay(self.user_agent)
+        if crawl_delay:
+            crawl_delay = min(float(crawl_delay), self.max_crawl_delay)
+        return RobotsRules(parser, time.monotonic() + self.ttl, crawl_delay)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_robots_cache():
+    """获取进程内共享的robots.txt缓存"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = RobotsCache.from_config()
+        return _shared_cache
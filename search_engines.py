@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+搜索引擎注册表
+根据config.SEARCH_ENGINES中的声明生成搜索引擎对象，
+所有搜索引擎共用同一套URL构造、分页和结果解析流程。
+新增搜索引擎只需在配置文件中添加一项。
+"""
+
+from urllib.parse import quote
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+from html_parsers import get_backend
+
+
+class SearchEngine:
+    """一个搜索引擎的声明式描述（选择器按解析后端预编译并缓存）"""
+    
+    def __init__(self, key, engine_config):
+        """
+        初始化搜索引擎
+        
+        Args:
+            key (str): 搜索引擎标识，即SEARCH_ENGINES中的键
+            engine_config (dict): SEARCH_ENGINES中对应的配置项
+        """
+        self.key = key
+        self.name = engine_config['name']
+        self.url_template = engine_config['url_template']
+        self.page_start, self.page_step = engine_config.get('page_offset', (0, 10))
+        self.timeout = engine_config.get('timeout', 10)
+        self.enabled = engine_config.get('enabled', True)
+        self.max_pages = engine_config.get('max_pages', 3)
+        
+        self.selectors = dict(engine_config['selectors'])
+        self.selectors.setdefault('link', 'a')
+        self.result_selector = self.selectors['result']
+        self.compiled_selectors = {}
+    
+    def get_selectors(self, backend):
+        """获取指定解析后端预编译好的选择器（每个后端只编译一次）"""
+        compiled = self.compiled_selectors.get(backend.name)
+        if compiled is None:
+            compiled = {
+                field: backend.compile(selector)
+                for field, selector in self.selectors.items()
+            }
+            self.compiled_selectors[backend.name] = compiled
+        return compiled
+    
+    def build_url(self, keyword, page):
+        """构造第page页（从0开始）的搜索URL"""
+        offset = self.page_start + page * self.page_step
+        return self.url_template.format(keyword=quote(keyword), offset=offset)
+    
+    def parse_results(self, html, keyword, page, backend=None):
+        """
+        解析搜索结果页
+        
+        Args:
+            html (str): 搜索结果页HTML
+            keyword (str): 搜索关键词
+            page (int): 页码（从0开始）
+            backend: 解析后端，默认按config.PARSER_CONFIG选择；
+                快速后端出错时自动退回BeautifulSoup
+        
+        Returns:
+            list: 搜索结果字典列表
+        """
+        if backend is None:
+            backend = get_backend()
+        
+        try:
+            return self._parse_with(backend, html, keyword, page)
+        except Exception:
+            if backend.name == 'bs4':
+                raise
+            return self._parse_with(get_backend('bs4'), html, keyword, page)
+    
+    def _parse_with(self, backend, html, keyword, page):
+        """使用指定后端提取结果"""
+        selectors = self.get_selectors(backend)
+        document = backend.parse(html)
+        results = []
+        
+        for result in backend.select(document, selectors['result']):
+            try:
+                title_elem = backend.select_one(result, selectors['title'])
+                if title_elem is None:
+                    continue
+                
+                link_elem = backend.select_one(title_elem, selectors['link'])
+                abstract_elem = backend.select_one(result, selectors['abstract'])
+                source_elem = backend.select_one(result, selectors['source'])
+                
+                results.append({
+                    'title': backend.text(title_elem),
+                    'link': backend.attr(link_elem, 'href') if link_elem is not None else '',
+                    'abstract': backend.text(abstract_elem) if abstract_elem is not None else '',
+                    'source': backend.text(source_elem) if source_elem is not None else '',
+                    'search_engine': self.name,
+                    'keyword': keyword,
+                    'page': page + 1
+                })
+            
+            except Exception:
+                continue
+        
+        return results
+
+
+def iter_search_pages(engine, keyword, max_pages, fetch_html, prefetch=False, target_results=None,
+                      parse_page=None):
+    """
+    依次抓取并解析搜索结果页
+    
+    某一页没有新结果（空页或全部与前面的页重复）时认为结果已经翻完，不再请求后面的页。
+    
+    Args:
+        engine (SearchEngine): 搜索引擎
+        keyword (str): 搜索关键词
+        max_pages (int): 最大页数
+        fetch_html (callable): fetch_html(url, timeout) 返回页面HTML
+        prefetch (bool): 是否流水线抓取：第N页下载完成后，解析它的同时在后台线程下载第N+1页
+            （下载仍然逐页进行并遵守限速，结果按页码顺序返回）。
+            第N页为空或达到target_results而提前停止时，已经开始的第N+1页会多发送一次请求；
+            按上一页的新结果数估计第N页就能达到target_results时不预取第N+1页
+        target_results (int): 累计获得这么多条不重复的结果后停止，None表示不限制
+        parse_page (callable): parse_page(html, keyword, page) 返回结果列表，
+            默认为engine.parse_results（可替换为在解析进程中执行的版本）
+    
+    Yields:
+        tuple: (page, results, error)，results只包含前面的页中没有出现过的结果，
+            抓取或解析失败时results为None
+    """
+    seen = set()
+    total = 0
+    last_count = 0
+    
+    def want_more():
+        # 按上一页的新结果数估计，正在处理的页可能已经够数时不再预取下一页
+        return target_results is None or total + last_count < target_results
+    
+    pages = _fetch_and_parse_pages(engine, keyword, max_pages, fetch_html, prefetch,
+                                   parse_page or engine.parse_results, want_more)
+    try:
+        for page, results, error in pages:
+            if error is not None:
+                yield page, None, error
+                continue
+            
+            new_results = []
+            for result in results:
+                key = result['link'] or result['title']
+                if key not in seen:
+                    seen.add(key)
+                    new_results.append(result)
+            if target_results is not None:
+                new_results = new_results[:target_results - total]
+            total += len(new_results)
+            last_count = len(new_results)
+            
+            yield page, new_results, None
+            if not new_results or (target_results is not None and total >= target_results):
+                return
+    finally:
+        pages.close()
+
+
+def _fetch_and_parse_pages(engine, keyword, max_pages, fetch_html, prefetch, parse_page, want_more):
+    """
+    逐页抓取并解析（iter_search_pages的实现，不做去重和提前停止）
+    
+    预取时want_more()返回False则不预取下一页，需要时再下载
+    """
+    if not prefetch:
+        for page in range(max_pages):
+            try:
+                html = fetch_html(engine.build_url(keyword, page), engine.timeout)
+                yield page, parse_page(html, keyword, page), None
+            except Exception as e:
+                yield page, None, e
+        return
+    
+    def submit(page):
+        return executor.submit(fetch_html, engine.build_url(keyword, page), engine.timeout)
+    
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = None
+        for page in range(max_pages):
+            current = future or submit(page)
+            future = None
+            try:
+                html = current.result()
+            except Exception as e:
+                yield page, None, e
+                continue
+            # 当前页下载完成后才预取下一页，调用方在这之前停止迭代时不会多发请求
+            if page + 1 < max_pages and want_more():
+                future = submit(page + 1)
+            try:
+                results = parse_page(html, keyword, page)
+            except Exception as e:
+                yield page, None, e
+                continue
+            yield page, results, None
+    finally:
+        # 调用方提前停止迭代时不再等待尚未开始的预取
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+ENGINE_REGISTRY = {
+    key: SearchEngine(key, engine_config)
+    for key, engine_config in config.SEARCH_ENGINES.items()
+}
+
+
+def get_engine(key):
+    """按名称获取搜索引擎，不存在时返回None"""
+    return ENGINE_REGISTRY.get(key)
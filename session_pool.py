@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内共享的连接池
+所有爬虫实例的Session都挂载同一个HTTPAdapter，keep-alive连接在不同任务、不同线程之间复用，
+再次访问同一网站时不必重新建立TCP/TLS连接。
+HTTPAdapter底层的urllib3连接池是线程安全的；每个主机的连接数有上限
+"""
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config
+from dns_cache import install_dns_cache
+
+
+def pool_options():
+    """按config.SESSION_POOL_CONFIG生成HTTPAdapter的连接池参数"""
+    return {
+        'pool_connections': config.SESSION_POOL_CONFIG['pool_connections'],
+        'pool_maxsize': config.SESSION_POOL_CONFIG['pool_maxsize'],
+        'pool_block': config.SESSION_POOL_CONFIG['pool_block'],
+    }
+
+
+_shared_adapter = None
+_shared_adapter_lock = threading.Lock()
+
+
+def get_shared_adapter():
+    """获取进程内共享的HTTPAdapter"""
+    global _shared_adapter
+    with _shared_adapter_lock:
+        if _shared_adapter is None:
+            install_dns_cache()
+            _shared_adapter = HTTPAdapter(**pool_options())
+        return _shared_adapter
+
+
+def mount_adapter(session, adapter):
+    """把adapter挂载到session的http://和https://上"""
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return adapter
+
+
+def create_session(headers=None):
+    """
+    创建使用共享连接池的Session
+    
+    Session本身很轻量（只保存请求头和Cookie），可以每个爬虫实例创建一个；
+    真正的连接保存在共享的HTTPAdapter中
+    
+    Args:
+        headers (dict): 默认请求头
+    """
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    mount_adapter(session, get_shared_adapter())
+    return session
@@ -5,21 +5,40 @@
 专门用于快速搜索和获取结果
 """
 
-import requests
-import time
-import random
-from urllib.parse import quote
-from bs4 import BeautifulSoup
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 from datetime import datetime
 import json
+import config
+from http_cache import install_http_cache
+from session_pool import create_session
+from connection_warmup import warm_up
+from rate_limiter import get_rate_limiter
+from fetcher import Fetcher, UnsupportedContentType
+from robots_cache import RobotsDisallowed
+from circuit_breaker import CircuitOpenError
+from task_budget import TaskBudget, BudgetExhausted
+from retry_policy import RetryPolicy
+from search_engines import get_engine, iter_search_pages
+from result_writers import open_writer
+from charset_sniffer import sniff_encoding
+from parse_pool import extract_website, parse_search_page, run_parse, run_parse_async
+from crawl_pipeline import CrawlPipeline, Stage, format_stats
+from page_extractor import content_key, iter_keyword_matches
 
 class SimpleCrawler:
     """简化版爬虫类"""
     
-    def __init__(self):
-        """初始化爬虫"""
-        self.session = requests.Session()
+    def __init__(self, use_http_cache=None):
+        """
+        初始化爬虫
+        
+        Args:
+            use_http_cache (bool): 是否启用磁盘HTTP缓存，默认使用config.CACHE_CONFIG['enabled']
+        """
+        self.session = create_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -27,486 +46,397 @@ class SimpleCrawler:
             'Accept-Encoding': 'gzip, deflate',
             'Connection': 'keep-alive',
         })
+        self.rate_limiter = get_rate_limiter()
+        self.retry_policy = RetryPolicy.from_config()
         self.results = []
+        
+        if use_http_cache is None:
+            use_http_cache = config.CACHE_CONFIG['enabled']
+        if use_http_cache:
+            install_http_cache(self.session)
+        self.fetcher = Fetcher(self.session, self.rate_limiter)
     
-    def search_baidu(self, keyword, max_pages=3):
-        """百度搜索"""
-        print(f"正在搜索百度: {keyword}")
+    def search_engine(self, engine_key, keyword, max_pages=3, target_results=None,
+                      deadline=None, max_bytes=None):
+        """
+        使用注册表中的搜索引擎进行搜索
+        
+        某一页没有新结果时提前停止翻页；target_results指定时，获得足够的不重复结果后停止。
+        deadline（秒）和max_bytes为本次搜索的总耗时和总下载量上限（默认使用config.TASK_BUDGET_CONFIG），
+        用完时返回已经获得的结果
+        """
+        engine = get_engine(engine_key)
+        if engine is None:
+            print(f"❌ 不支持的搜索引擎: {engine_key}")
+            return []
+        print(f"正在搜索{engine.name}: {keyword}")
         results = []
+        retry_budget = self.retry_policy.new_budget()
+        task_budget = TaskBudget.from_config(deadline, max_bytes)
         
-        for page in range(max_pages):
-            try:
-                pn = page * 10
-                url = f"https://www.baidu.com/s?wd={quote(keyword)}&pn={pn}"
-                
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 查找搜索结果
-                search_results = soup.find_all('div', class_='result')
-                
-                for result in search_results:
-                    try:
-                        # 获取标题
-                        title_elem = result.find('h3')
-                        if not title_elem:
-                            continue
-                        
-                        title = title_elem.get_text(strip=True)
-                        link = title_elem.find('a')['href'] if title_elem.find('a') else ''
-                        
-                        # 获取摘要
-                        abstract_elem = result.find('div', class_='c-abstract')
-                        abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                        
-                        # 获取来源
-                        source_elem = result.find('div', class_='c-abstract-source')
-                        source = source_elem.get_text(strip=True) if source_elem else ''
-                        
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'abstract': abstract,
-                            'source': source,
-                            'search_engine': '百度',
-                            'keyword': keyword,
-                            'page': page + 1
-                        })
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"第 {page + 1} 页完成，获取 {len(search_results)} 个结果")
-                time.sleep(random.uniform(1, 2))  # 避免请求过快
-                
-            except Exception as e:
-                print(f"百度搜索第 {page + 1} 页失败: {e}")
-                continue
+        def fetch_html(url, timeout):
+            return self.retry_policy.call(
+                lambda: self._fetch_page(url, timeout, task_budget),
+                retry_budget, self._report_retry, task_budget)
         
-        return results
-    
-    def search_bing(self, keyword, max_pages=3):
-        """必应搜索"""
-        print(f"正在搜索必应: {keyword}")
-        results = []
+        def parse_page(html, keyword, page):
+            return run_parse(parse_search_page, engine.key, html, keyword, page)
         
-        for page in range(max_pages):
-            try:
-                first = page * 10
-                url = f"https://www.bing.com/search?q={quote(keyword)}&first={first}"
-                
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 查找搜索结果
-                search_results = soup.find_all('li', class_='b_algo')
-                
-                for result in search_results:
-                    try:
-                        # 获取标题
-                        title_elem = result.find('h3')
-                        if not title_elem:
-                            continue
-                        
-                        title = title_elem.get_text(strip=True)
-                        link = title_elem.find('a')['href'] if title_elem.find('a') else ''
-                        
-                        # 获取摘要
-                        abstract_elem = result.find('p')
-                        abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                        
-                        # 获取来源
-                        source_elem = result.find('cite')
-                        source = source_elem.get_text(strip=True) if source_elem else ''
-                        
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'abstract': abstract,
-                            'source': source,
-                            'search_engine': '必应',
-                            'keyword': keyword,
-                            'page': page + 1
-                        })
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"第 {page + 1} 页完成，获取 {len(search_results)} 个结果")
-                time.sleep(random.uniform(1, 2))
-                
-            except Exception as e:
-                print(f"必应搜索第 {page + 1} 页失败: {e}")
+        pages = iter_search_pages(engine, keyword, max_pages, fetch_html,
+                                  prefetch=config.CRAWLER_CONFIG['prefetch_pages'],
+                                  target_results=target_results, parse_page=parse_page)
+        for page, page_results, error in pages:
+            if isinstance(error, BudgetExhausted):
+                print(f"⏱️ {error}，返回已获取的 {len(results)} 个结果")
+                break
+            if error is not None:
+                print(f"{engine.name}搜索第 {page + 1} 页失败: {error}")
                 continue
+            
+            results.extend(page_results)
+            print(f"第 {page + 1} 页完成，获取 {len(page_results)} 个结果")
+            if not page_results and page + 1 < max_pages:
+                print(f"第 {page + 1} 页没有新结果，停止翻页")
         
         return results
     
-    def search_all(self, keyword, max_pages=3):
-        """搜索所有支持的搜索引擎"""
+    def _fetch_page(self, url, timeout, task_budget=None):
+        """获取搜索结果页HTML"""
+        return self.fetcher.fetch_page(url, budget=task_budget, timeout=timeout).text
+    
+    @staticmethod
+    def _report_retry(attempt, error, delay):
+        """打印重试信息"""
+        print(f"⚠️ 第{attempt}次重试（{delay:.1f}秒后）: {error}")
+    
+    def search_baidu(self, keyword, max_pages=3, target_results=None):
+        """百度搜索"""
+        return self.search_engine('baidu', keyword, max_pages, target_results)
+    
+    def search_bing(self, keyword, max_pages=3, target_results=None):
+        """必应搜索"""
+        return self.search_engine('bing', keyword, max_pages, target_results)
+    
+    def search_all(self, keyword, max_pages=3, target_results=None):
+        """搜索所有支持的搜索引擎（target_results对每个搜索引擎分别生效）"""
         all_results = []
         
         # 搜索百度
-        baidu_results = self.search_baidu(keyword, max_pages)
+        baidu_results = self.search_baidu(keyword, max_pages, target_results)
         all_results.extend(baidu_results)
         
         # 搜索必应
-        bing_results = self.search_bing(keyword, max_pages)
+        bing_results = self.search_bing(keyword, max_pages, target_results)
         all_results.extend(bing_results)
         
         return all_results
     
-    def search_website(self, keyword, website_url, max_pages=3):
-        """直接爬取指定网站"""
+    def search_website(self, keyword, website_url, max_pages=3, deadline=None, max_bytes=None):
+        """
+        直接爬取指定网站
+        
+        deadline（秒）和max_bytes为本次爬取的总耗时和总下载量上限（默认使用config.TASK_BUDGET_CONFIG），
+        页面超出字节上限时只解析已下载的部分
+        """
         print(f"正在爬取网站: {website_url}")
         print(f"搜索关键词: {keyword}")
-        results = []
         
         try:
-            # 更新请求头，模拟真实浏览器
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Cache-Control': 'max-age=0',
-                'Referer': 'https://www.google.com/',
-                'DNT': '1',
-                'Sec-Fetch-User': '?1'
-            }
-            
-            print(f"🔍 正在发送请求到: {website_url}")
-            
-            # 设置更长的超时时间和重试机制
-            for attempt in range(3):
-                try:
-                    response = self.session.get(website_url, headers=headers, timeout=30)
-                    response.raise_for_status()
-                    print(f"✅ 请求成功，状态码: {response.status_code}")
-                    print(f"📄 响应大小: {len(response.text)} 字符")
-                    print(f"🔍 响应编码: {response.encoding}")
-                    print(f"🔍 响应头Content-Type: {response.headers.get('Content-Type', '未知')}")
-                    break
-                except Exception as e:
-                    if attempt == 2:
-                        raise e
-                    print(f"第{attempt + 1}次尝试失败，正在重试...")
-                    time.sleep(3)
-            
-            # 尝试多种编码方式
-            html_content = None
-            encodings_to_try = ['utf-8', 'gbk', 'gb2312', 'big5', 'latin1']
+            page = self._fetch_website(website_url, TaskBudget.from_config(deadline, max_bytes))
+            return self._extract_website_matches([keyword], website_url, page)
             
-            for encoding in encodings_to_try:
-                try:
-                    response.encoding = encoding
-                    html_content = response.text
-                    print(f"✅ 使用编码 {encoding} 成功解析")
-                    break
-                except Exception as e:
-                    print(f"❌ 编码 {encoding} 失败: {e}")
-                    continue
-            
-            if html_content is None:
-                # 如果所有编码都失败，使用默认方式
-                html_content = response.text
-                print("⚠️ 使用默认编码解析")
-            
-            # 尝试多种解析器
-            soup = None
-            parsers_to_try = ['html.parser', 'lxml', 'html5lib']
-            
-            for parser in parsers_to_try:
-                try:
-                    soup = BeautifulSoup(html_content, parser)
-                    print(f"✅ 使用解析器 {parser} 成功")
-                    break
-                except Exception as e:
-                    print(f"❌ 解析器 {parser} 失败: {e}")
-                    continue
-            
-            if soup is None:
-                raise Exception("所有解析器都失败了")
-            
-            # 调试：检查页面基本结构
-            print(f"🔍 页面标题: {soup.title.get_text() if soup.title else '无标题'}")
-            print(f"🔍 找到的标题标签数量: {len(soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))}")
-            print(f"🔍 找到的段落标签数量: {len(soup.find_all('p'))}")
-            print(f"🔍 找到的链接标签数量: {len(soup.find_all('a'))}")
-            print(f"🔍 找到的div标签数量: {len(soup.find_all('div'))}")
-            print(f"🔍 找到的span标签数量: {len(soup.find_all('span'))}")
-            
-            # 尝试查找JavaScript变量中的内容
-            print("🔍 搜索JavaScript变量中的内容...")
-            script_tags = soup.find_all('script')
-            for script in script_tags:
-                if script.string:
-                    script_content = script.string
-                    if keyword.lower() in script_content.lower():
-                        print(f"✅ 在JavaScript中找到关键词")
-                        # 提取包含关键词的上下文
-                        keyword_index = script_content.lower().find(keyword.lower())
-                        if keyword_index != -1:
-                            start = max(0, keyword_index - 100)
-                            end = min(len(script_content), keyword_index + 100)
-                            context = script_content[start:end]
-                            
-                            results.append({
-                                'title': f"JavaScript中的关键词内容",
-                                'link': website_url,
-                                'abstract': context,
-                                'source': website_url,
-                                'search_engine': '直接爬取',
-                                'keyword': keyword,
-                                'page': 1
-                            })
-            
-            # 方法1: 查找标题包含关键词的元素（更全面的标题标签）
-            title_elements = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'title', 'a'])
-            print(f"🔍 开始搜索标题元素，共找到 {len(title_elements)} 个")
-            
-            for title_elem in title_elements:
-                title_text = title_elem.get_text(strip=True)
-                if keyword.lower() in title_text.lower() and len(title_text) > 2:
-                    print(f"✅ 在标题中找到关键词: {title_text[:50]}...")
-                    # 查找相关的链接和摘要
-                    link_url = ''
-                    if title_elem.name == 'a' and title_elem.get('href'):
-                        link_url = title_elem['href']
-                    else:
-                        link = title_elem.find('a')
-                        if link and link.get('href'):
-                            link_url = link['href']
-                    
-                    # 处理相对链接
-                    if link_url and not link_url.startswith('http'):
-                        if link_url.startswith('/'):
-                            link_url = website_url.rstrip('/') + link_url
-                        else:
-                            link_url = website_url.rstrip('/') + '/' + link_url
-                    
-                    # 查找摘要（更智能的摘要查找）
-                    abstract = ''
-                    # 查找标题附近的段落
-                    next_elem = title_elem.find_next_sibling()
-                    if next_elem and next_elem.name == 'p':
-                        abstract = next_elem.get_text(strip=True)
-                    # 查找父元素中的段落
-                    elif title_elem.parent:
-                        parent_para = title_elem.parent.find('p')
-                        if parent_para:
-                            abstract = parent_para.get_text(strip=True)
-                    
-                    results.append({
-                        'title': title_text,
-                        'link': link_url,
-                        'abstract': abstract,
-                        'source': website_url,
-                        'search_engine': '直接爬取',
-                        'keyword': keyword,
-                        'page': 1
-                    })
-            
-            # 方法2: 查找段落中包含关键词的内容（更智能的段落查找）
-            paragraphs = soup.find_all(['p', 'div', 'span'])
-            print(f"🔍 开始搜索段落元素，共找到 {len(paragraphs)} 个")
-            
-            for p in paragraphs:
-                p_text = p.get_text(strip=True)
-                if (keyword.lower() in p_text.lower() and 
-                    len(p_text) > 15 and 
-                    len(p_text) < 500):  # 避免过长的内容
-                    
-                    print(f"✅ 在段落中找到关键词: {p_text[:50]}...")
-                    
-                    # 查找相关的标题
-                    title = ''
-                    # 向上查找标题
-                    prev_elem = p.find_previous(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                    if prev_elem:
-                        title = prev_elem.get_text(strip=True)
-                    # 查找父元素中的标题
-                    elif p.parent:
-                        parent_title = p.parent.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                        if parent_title:
-                            title = parent_title.get_text(strip=True)
-                    
-                    # 查找链接
-                    link_url = ''
-                    link = p.find('a')
-                    if link and link.get('href'):
-                        link_url = link['href']
-                        if not link_url.startswith('http'):
-                            if link_url.startswith('/'):
-                                link_url = website_url.rstrip('/') + link_url
-                            else:
-                                link_url = website_url.rstrip('/') + '/' + link_url
-                    
-                    results.append({
-                        'title': title or f"包含关键词的段落",
-                        'link': link_url,
-                        'abstract': p_text[:200] + '...' if len(p_text) > 200 else p_text,
-                        'source': website_url,
-                        'search_engine': '直接爬取',
-                        'keyword': keyword,
-                        'page': 1
-                    })
-            
-            # 方法3: 查找链接文本包含关键词的链接
-            links = soup.find_all('a')
-            print(f"🔍 开始搜索链接元素，共找到 {len(links)} 个")
-            
-            for link in links:
-                link_text = link.get_text(strip=True)
-                if (keyword.lower() in link_text.lower() and 
-                    len(link_text) > 2 and 
-                    len(link_text) < 100):  # 避免过长的链接文本
-                    
-                    print(f"✅ 在链接中找到关键词: {link_text[:50]}...")
-                    
-                    link_url = link.get('href', '')
-                    if link_url and not link_url.startswith('http'):
-                        if link_url.startswith('/'):
-                            link_url = website_url.rstrip('/') + link_url
-                        else:
-                            link_url = website_url.rstrip('/') + '/' + link_url
-                    
-                    # 查找链接附近的摘要
-                    abstract = ''
-                    next_elem = link.find_next_sibling()
-                    if next_elem and next_elem.name == 'p':
-                        abstract = next_elem.get_text(strip=True)
-                    # 查找父元素中的段落
-                    elif link.parent:
-                        parent_para = link.parent.find('p')
-                        if parent_para:
-                            abstract = parent_para.get_text(strip=True)
-                    
-                    results.append({
-                        'title': link_text,
-                        'link': link_url,
-                        'abstract': abstract,
-                        'source': website_url,
-                        'search_engine': '直接爬取',
-                        'keyword': keyword,
-                        'page': 1
-                    })
-            
-            # 方法4: 查找表格中包含关键词的内容
-            tables = soup.find_all('table')
-            print(f"🔍 开始搜索表格元素，共找到 {len(tables)} 个")
-            
-            for table in tables:
-                table_text = table.get_text(strip=True)
-                if keyword.lower() in table_text.lower():
-                    print(f"✅ 在表格中找到关键词")
-                    # 查找表格标题
-                    caption = table.find('caption')
-                    title = caption.get_text(strip=True) if caption else "包含关键词的表格"
-                    
-                    # 提取表格摘要
-                    rows = table.find_all('tr')
-                    table_summary = []
-                    for row in rows[:3]:  # 只取前3行作为摘要
-                        cells = row.find_all(['td', 'th'])
-                        row_text = ' | '.join([cell.get_text(strip=True) for cell in cells])
-                        if row_text:
-                            table_summary.append(row_text)
-                    
-                    abstract = ' | '.join(table_summary)
-                    
-                    results.append({
-                        'title': title,
-                        'link': '',
-                        'abstract': abstract,
-                        'source': website_url,
-                        'search_engine': '直接爬取',
-                        'keyword': keyword,
-                        'page': 1
-                    })
-            
-            print(f"🔍 初步搜索完成，找到 {len(results)} 个结果")
-            
-            # 去重结果（基于标题和摘要的组合）
-            unique_results = []
-            seen_content = set()
-            for result in results:
-                content_key = f"{result['title']}_{result['abstract'][:50]}"
-                if content_key not in seen_content:
-                    unique_results.append(result)
-                    seen_content.add(content_key)
-            
-            print(f"🔍 去重后剩余 {len(unique_results)} 个结果")
-            
-            # 如果没有找到结果，尝试更宽松的搜索
-            if not unique_results:
-                print("⚠️ 未找到精确匹配，尝试模糊搜索...")
-                # 搜索包含关键词字符的内容
-                all_text = soup.get_text()
-                print(f"🔍 页面总文本长度: {len(all_text)} 字符")
-                
-                if keyword.lower() in all_text.lower():
-                    print("✅ 页面确实包含关键词，尝试提取上下文...")
-                    # 提取包含关键词的上下文
-                    keyword_index = all_text.lower().find(keyword.lower())
-                    if keyword_index != -1:
-                        start = max(0, keyword_index - 100)
-                        end = min(len(all_text), keyword_index + 100)
-                        context = all_text[start:end]
-                        
-                        unique_results.append({
-                            'title': f"包含关键词的页面内容",
-                            'link': website_url,
-                            'abstract': context,
-                            'source': website_url,
-                            'search_engine': '直接爬取',
-                            'keyword': keyword,
-                            'page': 1
-                        })
-                        print("✅ 通过模糊搜索找到相关内容")
-                else:
-                    print("❌ 页面中确实没有找到关键词")
-                    
-                    # 尝试搜索关键词的部分字符
-                    print("🔍 尝试搜索关键词的部分字符...")
-                    for i in range(len(keyword), 1, -1):
-                        partial_keyword = keyword[:i]
-                        if partial_keyword.lower() in all_text.lower():
-                            print(f"✅ 找到部分关键词: {partial_keyword}")
-                            keyword_index = all_text.lower().find(partial_keyword.lower())
-                            start = max(0, keyword_index - 100)
-                            end = min(len(all_text), keyword_index + 100)
-                            context = all_text[start:end]
-                            
-                            unique_results.append({
-                                'title': f"包含部分关键词'{partial_keyword}'的页面内容",
-                                'link': website_url,
-                                'abstract': context,
-                                'source': website_url,
-                                'search_engine': '直接爬取',
-                                'keyword': keyword,
-                                'page': 1
-                            })
-                            break
+        except (RobotsDisallowed, CircuitOpenError, UnsupportedContentType) as e:
+            print(f"🚫 {e}")
+            return []
+        except BudgetExhausted as e:
+            print(f"⏱️ {e}")
+            return []
+        except Exception as e:
+            print(f"❌ 爬取网站失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return []
+    
+    def iter_website_matches(self, keyword, website_url, deadline=None, max_bytes=None):
+        """
+        直接爬取指定网站，逐条产生去重后的结果（search_website的生成器版本）
+        
+        页面解析完成后每找到一条结果就立即产生，调用方可以边接收边输出，
+        不必等整页结果收集完毕；解析在当前线程中进行。出错时的处理与search_website相同。
+        结果按文档顺序去重，去重键相同的多条结果中保留的可能与search_website不同，见iter_keyword_matches
+        
+        Yields:
+            dict: 搜索结果
+        """
+        print(f"正在爬取网站: {website_url}")
+        print(f"搜索关键词: {keyword}")
+        
+        try:
+            page = self._fetch_website(website_url, TaskBudget.from_config(deadline, max_bytes))
+            print(f"✅ 使用编码 {page.encoding} 解码（来源: {page.encoding_source}）")
+            yield from iter_keyword_matches(page.text, keyword, website_url)
             
-            print(f"🎯 最终结果数量: {len(unique_results)}")
-            return unique_results
+        except (RobotsDisallowed, CircuitOpenError, UnsupportedContentType) as e:
+            print(f"🚫 {e}")
+        except BudgetExhausted as e:
+            print(f"⏱️ {e}")
+        except Exception as e:
+            print(f"❌ 爬取网站失败: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    def search_website_multi(self, keywords, website_url, deadline=None, max_bytes=None):
+        """
+        在同一网站中同时搜索多个关键词（只下载和解析一次）
+        
+        Args:
+            keywords (list): 关键词列表
+            website_url (str): 目标网站URL
+            deadline (float): 总耗时上限（秒），默认使用config.TASK_BUDGET_CONFIG
+            max_bytes (int): 总下载量上限（字节），默认使用config.TASK_BUDGET_CONFIG
+        
+        Returns:
+            list: 搜索结果，matched_keywords字段为该结果匹配到的关键词列表
+        """
+        print(f"正在爬取网站: {website_url}")
+        print(f"搜索关键词: {', '.join(keywords)}")
+        
+        try:
+            page = self._fetch_website(website_url, TaskBudget.from_config(deadline, max_bytes))
+            return self._extract_website_matches(keywords, website_url, page, multi=True)
             
+        except (RobotsDisallowed, CircuitOpenError, UnsupportedContentType) as e:
+            print(f"🚫 {e}")
+            return []
+        except BudgetExhausted as e:
+            print(f"⏱️ {e}")
+            return []
         except Exception as e:
             print(f"❌ 爬取网站失败: {e}")
             import traceback
             traceback.print_exc()
             return []
     
+    async def search_websites_async(self, keyword, website_urls, concurrency=8,
+                                    deadline=None, max_bytes=None):
+        """
+        并发爬取多个网站首页
+        
+        下载在线程池中执行，同时进行的请求数不超过concurrency，
+        每个页面下载完成后立即把原始内容交给解析进程池（config.PARSE_POOL_CONFIG），
+        解析分布到多个CPU核上，提取逻辑与search_website相同。
+        
+        Args:
+            keyword (str): 搜索关键词
+            website_urls (list): 目标网站URL列表
+            concurrency (int): 最大并发请求数
+            deadline (float): 整批爬取的总耗时上限（秒），默认使用config.TASK_BUDGET_CONFIG
+            max_bytes (int): 整批爬取的总下载量上限（字节），默认使用config.TASK_BUDGET_CONFIG
+        
+        Returns:
+            list: 按website_urls顺序合并的搜索结果（预算用完时只包含已完成的网站）
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        task_budget = TaskBudget.from_config(deadline, max_bytes)
+        
+        if config.WARMUP_CONFIG['enabled']:
+            await loop.run_in_executor(None, self.warm_up_connections, website_urls)
+        
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            async def crawl_one(website_url):
+                try:
+                    async with semaphore:
+                        page = await loop.run_in_executor(
+                            executor, self._fetch_website, website_url, task_budget)
+                    parsed = await run_parse_async(
+                        extract_website, page.content, page.content_type, [keyword], website_url,
+                        executor=executor)
+                    return self._report_parsed(parsed)
+                except Exception as e:
+                    print(f"❌ 爬取网站失败 {website_url}: {e}")
+                    return []
+            
+            site_results = await asyncio.gather(*(crawl_one(url) for url in website_urls))
+        
+        all_results = []
+        for results in site_results:
+            all_results.extend(results)
+        
+        print(f"🎯 共爬取 {len(website_urls)} 个网站，获得 {len(all_results)} 个结果")
+        return all_results
+    
+    def warm_up_connections(self, website_urls):
+        """并行解析DNS并建立到各网站的连接，爬取时第一次请求直接复用"""
+        results = warm_up(website_urls, self.session)
+        ready = sum(1 for result in results if result['ok'])
+        print(f"🔥 连接预热完成: {ready}/{len(results)} 个网站已就绪")
+        return results
+    
+    def search_websites(self, keyword, website_urls, concurrency=8, deadline=None, max_bytes=None):
+        """并发爬取多个网站（search_websites_async的同步入口）"""
+        return asyncio.run(self.search_websites_async(
+            keyword, website_urls, concurrency, deadline, max_bytes))
+    
+    def build_website_pipeline(self, keyword, sink, deadline=None, max_bytes=None):
+        """
+        构建多网站爬取流水线：下载 → 解码 → 解析提取 → 去重 → 输出
+        
+        各阶段的线程数和队列长度见config.PIPELINE_CONFIG。输出或解析变慢时队列被填满，
+        下载随之放慢，已下载但未处理的页面数量始终有上限。
+        解码阶段只确定编码（BOM、响应头、meta声明或开头的字节），页面以原始字节连同编码交给解析进程，
+        全文解码和提取都在解析进程中完成，解析进程不再重复检测编码
+        
+        Args:
+            keyword (str): 搜索关键词
+            sink (callable): sink(result) 逐条接收去重后的结果（在输出阶段的线程中调用）
+            deadline (float): 整条流水线的总耗时上限（秒），默认使用config.TASK_BUDGET_CONFIG
+            max_bytes (int): 整条流水线的总下载量上限（字节），默认使用config.TASK_BUDGET_CONFIG
+        
+        Returns:
+            CrawlPipeline: 调用run(website_urls)开始爬取，stop()停止
+        """
+        task_budget = TaskBudget.from_config(deadline, max_bytes)
+        seen = set()
+        seen_lock = threading.Lock()
+        
+        def fetch(website_url):
+            return [(website_url, self._fetch_website(website_url, task_budget))]
+        
+        def decode(item):
+            website_url, page = item
+            encoding, source = sniff_encoding(page.content, page.content_type)
+            print(f"✅ 使用编码 {encoding} 解码（来源: {source}）")
+            return [(website_url, page.content, page.content_type, (encoding, source))]
+        
+        def parse(item):
+            website_url, content, content_type, sniffed = item
+            results, _, _ = run_parse(extract_website, content, content_type, [keyword], website_url,
+                                      False, sniffed)
+            return results
+        
+        def dedup(result):
+            # 与单个页面内的去重使用同一个键，跨网站重复的结果只保留第一条
+            key = content_key(result)
+            with seen_lock:
+                if key in seen:
+                    return None
+                seen.add(key)
+            return [result]
+        
+        return CrawlPipeline([
+            Stage.from_config('fetch', fetch),
+            Stage.from_config('decode', decode),
+            Stage.from_config('parse', parse),
+            Stage.from_config('dedup', dedup),
+            Stage.from_config('sink', sink),
+        ], on_error=self._report_pipeline_error)
+    
+    def crawl_websites(self, keyword, website_urls, sink=None, deadline=None, max_bytes=None):
+        """
+        用流水线爬取多个网站首页
+        
+        Args:
+            keyword (str): 搜索关键词
+            website_urls (iterable): 目标网站URL（可以是生成器，按需读取）
+            sink (callable): 逐条接收结果的函数，None表示收集到列表中返回
+            deadline (float): 总耗时上限（秒），默认使用config.TASK_BUDGET_CONFIG
+            max_bytes (int): 总下载量上限（字节），默认使用config.TASK_BUDGET_CONFIG
+        
+        Returns:
+            list: sink为None时返回全部结果，否则返回空列表
+        """
+        results = []
+        pipeline = self.build_website_pipeline(keyword, sink or results.append, deadline, max_bytes)
+        stats = pipeline.run(website_urls)
+        
+        print(f"\n流水线各阶段统计:")
+        for line in format_stats(stats):
+            print(f"  {line}")
+        failed = stats['fetch']['errors']
+        print(f"🎯 共爬取 {stats['fetch']['processed'] - failed} 个网站（{failed} 个失败），"
+              f"获得 {stats['sink']['processed']} 个结果")
+        return results
+    
+    @staticmethod
+    def _report_pipeline_error(stage_name, item, error):
+        """打印流水线中单个项目的错误"""
+        if isinstance(error, (RobotsDisallowed, CircuitOpenError, UnsupportedContentType)):
+            print(f"🚫 {error}")
+        elif isinstance(error, BudgetExhausted):
+            print(f"⏱️ {error}")
+        elif isinstance(item, (str, tuple)):
+            # 下载、解码、解析阶段的项目是URL或以URL开头的元组
+            website_url = item if isinstance(item, str) else item[0]
+            print(f"❌ {stage_name}阶段处理失败 {website_url}: {error}")
+        else:
+            print(f"❌ {stage_name}阶段处理失败: {error}")
+    
+    def _fetch_website(self, website_url, task_budget=None):
+        """
+        下载网站首页（task_budget限制超时时间和读取的字节数）
+        
+        Returns:
+            FetchedPage: 未解码的页面，解码和提取在解析进程中进行
+        """
+        # 更新请求头，模拟真实浏览器
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+            'Accept-Encoding': 'gzip, deflate, br',
+            'Connection': 'keep-alive',
+            'Upgrade-Insecure-Requests': '1',
+            'Sec-Fetch-Dest': 'document',
+            'Sec-Fetch-Mode': 'navigate',
+            'Sec-Fetch-Site': 'none',
+            'Cache-Control': 'max-age=0',
+            'Referer': 'https://www.google.com/',
+            'DNT': '1',
+            'Sec-Fetch-User': '?1'
+        }
+        
+        print(f"🔍 正在发送请求到: {website_url}")
+        
+        def fetch():
+            return self.fetcher.fetch_page(website_url, check_robots=True, budget=task_budget,
+                                           headers=headers, timeout=30)
+        
+        # 设置更长的超时时间，暂时性错误按重试策略退避重试
+        page = self.retry_policy.call(fetch, self.retry_policy.new_budget(), self._report_retry, task_budget)
+        print(f"✅ 请求成功，状态码: {page.status_code}")
+        print(f"📄 响应大小: {len(page.content)} 字节")
+        if page.truncated:
+            print(f"⚠️ 页面超出大小上限或任务预算已用完，只解析前 {len(page.content)} 字节")
+        print(f"🔍 响应头Content-Type: {page.content_type or '未知'}")
+        
+        return page
+    
+    def _extract_website_matches(self, keywords, website_url, page, multi=False):
+        """在解析进程中解码页面并提取包含关键词的结果"""
+        parsed = run_parse(extract_website, page.content, page.content_type, keywords, website_url, multi)
+        return self._report_parsed(parsed)
+    
+    @staticmethod
+    def _report_parsed(parsed):
+        """打印解析进程使用的编码，返回结果列表"""
+        results, encoding, encoding_source = parsed
+        print(f"✅ 使用编码 {encoding} 解码（来源: {encoding_source}）")
+        return results
+    
     def save_results(self, results, filename=None, format='excel'):
-        """保存搜索结果"""
-        if not results:
+        """
+        保存搜索结果
+        
+        csv和jsonl格式逐条流式写入（results可以是生成器），按config.OUTPUT_CONFIG定期刷新、
+        超过大小上限时自动分卷；excel和json格式需要先收集全部结果
+        
+        Args:
+            results (iterable): 搜索结果
+            filename (str): 文件名（不含扩展名），默认按时间生成
+            format (str): 'excel'、'csv'、'json' 或 'jsonl'
+        """
+        if isinstance(results, list) and not results:
             print("没有结果可保存")
             return
         
@@ -515,22 +445,23 @@ class SimpleCrawler:
             filename = f"search_{timestamp}"
         
         try:
-            df = pd.DataFrame(results)
-            
-            if format.lower() == 'excel':
-                filepath = f"{filename}.xlsx"
-                df.to_excel(filepath, index=False, engine='openpyxl')
-                print(f"结果已保存到: {filepath}")
+            if format.lower() in ('csv', 'jsonl'):
+                with open_writer(filename, format) as writer:
+                    writer.write_all(results)
+                if writer.count == 0:
+                    print("没有结果可保存")
+                    return
+                print(f"结果已保存到: {', '.join(writer.paths)}（共 {writer.count} 条）")
                 
-            elif format.lower() == 'csv':
-                filepath = f"{filename}.csv"
-                df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            elif format.lower() == 'excel':
+                filepath = f"{filename}.xlsx"
+                pd.DataFrame(results).to_excel(filepath, index=False, engine='openpyxl')
                 print(f"结果已保存到: {filepath}")
                 
             elif format.lower() == 'json':
                 filepath = f"{filename}.json"
                 with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(results, f, ensure_ascii=False, indent=2)
+                    json.dump(list(results), f, ensure_ascii=False, indent=2)
                 print(f"结果已保存到: {filepath}")
                 
             else:
@@ -566,6 +497,22 @@ class SimpleCrawler:
             print(f"   搜索引擎: {result.get('search_engine', '未知')}")
             if result.get('abstract'):
                 print(f"   摘要: {result.get('abstract', '')[:80]}...")
+        
+        self.print_host_stats()
+    
+    def print_host_stats(self):
+        """打印各主机的自适应并发状态和熔断状态"""
+        host_stats = self.fetcher.stats()
+        open_hosts = self.fetcher.open_hosts()
+        if not host_stats and not open_hosts:
+            return
+        
+        print(f"\n主机并发状态:")
+        for host, stats in host_stats.items():
+            latency = f"{stats['latency_ms']} ms" if stats['latency_ms'] is not None else '未知'
+            print(f"  {host}: 并发上限 {stats['limit']}，平均延迟 {latency}，降低次数 {stats['decreases']}")
+        for host, retry_in in open_hosts.items():
+            print(f"  {host}: 已熔断，{retry_in:.0f} 秒后再尝试")
 
 
 def main():
@@ -596,8 +543,8 @@ def main():
         if results:
             save_choice = input(f"\n是否保存结果? (y/n, 默认y): ").strip().lower()
             if save_choice != 'n':
-                format_choice = input("选择保存格式 (excel/csv/json, 默认excel): ").strip().lower()
-                format_choice = format_choice if format_choice in ['excel', 'csv', 'json'] else 'excel'
+                format_choice = input("选择保存格式 (excel/csv/json/jsonl, 默认excel): ").strip().lower()
+                format_choice = format_choice if format_choice in ['excel', 'csv', 'json', 'jsonl'] else 'excel'
                 
                 filename = f"search_{keyword}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 crawler.save_results(results, filename, format_choice)
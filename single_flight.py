@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+并发请求合并（single-flight）
+同一时刻对同一个（规范化后的）URL的多个请求只真正执行一次，
+其余调用方等待并共享同一个结果或异常；每个调用方可以只等待到自己的截止时间
+"""
+
+import threading
+import contextvars
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """
+    规范化URL，使写法不同但指向同一页面的URL得到相同的键
+    
+    协议和主机名转为小写，去掉默认端口和#片段，查询参数按名称排序
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parts.port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+
+class SingleFlightTimeout(Exception):
+    """等待合并的调用结果超时（调用本身仍在继续）"""
+
+
+class _Call:
+    """一次正在执行的调用"""
+    
+    __slots__ = ('event', 'result', 'error', 'waiters')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """按键合并并发调用（线程安全）"""
+    
+    def __init__(self):
+        self.calls = {}
+        self.coalesced = 0      # 被合并（没有实际执行）的调用次数
+        self.lock = threading.Lock()
+    
+    def do(self, key, func, timeout=None):
+        """
+        执行func；如果相同key的调用正在进行，则等待它完成并共享结果
+        
+        Args:
+            key: 合并调用的键
+            func (callable): 无参数的函数
+            timeout (float): 最多等待的秒数，None表示一直等待。指定时func在后台线程中执行，
+                调用方超时离开不会中断func，结果仍交给其他等待方
+        
+        Returns:
+            func的返回值（实际执行的调用抛出异常时，所有等待方都会收到该异常）
+        
+        Raises:
+            SingleFlightTimeout: 等待超时
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+            else:
+                self.coalesced += 1
+            call.waiters += 1
+        
+        if leader:
+            if timeout is None:
+                self._run(key, call, func)
+            else:
+                # 后台线程继承调用方的上下文（如retry_policy中的重试链标识）
+                context = contextvars.copy_context()
+                threading.Thread(target=context.run, args=(self._run, key, call, func),
+                                 name='single-flight', daemon=True).start()
+        
+        if not call.event.wait(timeout):
+            with self.lock:
+                call.waiters -= 1
+            raise SingleFlightTimeout(f"等待 {key} 的结果超时")
+        if call.error is not None:
+            raise call.error
+        return call.result
+    
+    def wanted(self, key):
+        """是否还有调用方在等待key的结果（都已超时离开时，正在执行的func可以提前结束）"""
+        with self.lock:
+            call = self.calls.get(key)
+            return call is not None and call.waiters > 0
+    
+    def _run(self, key, call, func):
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.event.set()
+
+
+_shared_group = None
+_shared_group_lock = threading.Lock()
+
+
+def get_single_flight():
+    """获取进程内共享的请求合并器"""
+    global _shared_group
+    with _shared_group_lock:
+        if _shared_group is None:
+            _shared_group = SingleFlight()
+        return _shared_group
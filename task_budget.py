@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+任务预算
+为一次爬取任务设定总耗时上限和总下载字节数上限，
+预算逐级传递到每个请求：超时时间随剩余时间缩短，读取响应时不超过剩余字节数。
+预算用完时任务返回已经获得的部分结果，而不是整体失败
+"""
+
+import time
+import threading
+
+import config
+
+
+class BudgetExhausted(Exception):
+    """任务的时间或字节预算已用完"""
+
+
+class TaskBudget:
+    """一次任务的时间和字节预算（线程安全，可在任务内的多个请求之间共享）"""
+    
+    def __init__(self, deadline=None, max_bytes=None):
+        """
+        初始化预算
+        
+        Args:
+            deadline (float): 任务总耗时上限（秒），None表示不限制
+            max_bytes (int): 任务总下载字节数上限，None表示不限制
+        """
+        self.expires = time.monotonic() + deadline if deadline else None
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, deadline=None, max_bytes=None):
+        """创建预算，未指定的项使用config.TASK_BUDGET_CONFIG中的默认值"""
+        return cls(
+            deadline=deadline if deadline is not None else config.TASK_BUDGET_CONFIG['deadline'],
+            max_bytes=max_bytes if max_bytes is not None else config.TASK_BUDGET_CONFIG['max_bytes'],
+        )
+    
+    def remaining_time(self):
+        """剩余秒数，不限制时返回None"""
+        if self.expires is None:
+            return None
+        return max(self.expires - time.monotonic(), 0.0)
+    
+    def remaining_bytes(self):
+        """剩余可下载字节数，不限制时返回None"""
+        if self.max_bytes is None:
+            return None
+        with self.lock:
+            return max(self.max_bytes - self.used_bytes, 0)
+    
+    def add_bytes(self, count):
+        """记录已下载的字节数"""
+        with self.lock:
+            self.used_bytes += count
+    
+    def check(self):
+        """预算已用完时抛出BudgetExhausted"""
+        if self.remaining_time() == 0:
+            raise BudgetExhausted("任务时间预算已用完")
+        if self.remaining_bytes() == 0:
+            raise BudgetExhausted("任务下载字节预算已用完")
+    
+    def timeout(self, default):
+        """
+        本次请求可用的超时时间
+        
+        Args:
+            default (float): 请求原本的超时时间（秒）
+        
+        Returns:
+            float: 原超时时间与剩余时间中较小的一个
+        """
+        self.check()
+        remaining = self.remaining_time()
+        if remaining is None:
+            return default
+        return min(default, remaining) if default is not None else remaining
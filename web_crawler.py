@@ -5,13 +5,11 @@
 支持多种搜索引擎，可自定义关键词和搜索参数
 """
 
-import requests
 import time
 import random
 import json
 import re
-from urllib.parse import quote, urljoin
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
 from fake_useragent import UserAgent
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -19,6 +17,7 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from webdriver_manager.chrome import ChromeDriverManager
 import pandas as pd
 from tqdm import tqdm
@@ -26,6 +25,17 @@ import colorama
 from colorama import Fore, Style
 import os
 from datetime import datetime
+import config
+from http_cache import install_http_cache
+from session_pool import create_session
+from rate_limiter import get_rate_limiter
+from fetcher import Fetcher
+from retry_policy import RetryPolicy
+from task_budget import TaskBudget, BudgetExhausted
+from search_engines import get_engine, iter_search_pages
+from result_writers import open_writer
+from parse_pool import parse_search_page, run_parse
+from concurrent.futures import ThreadPoolExecutor
 
 # 初始化colorama
 colorama.init(autoreset=True)
@@ -33,19 +43,23 @@ colorama.init(autoreset=True)
 class WebCrawler:
     """网络爬虫主类"""
     
-    def __init__(self, use_selenium=False, headless=True):
+    def __init__(self, use_selenium=False, headless=True, use_http_cache=None):
         """
         初始化爬虫
         
         Args:
             use_selenium (bool): 是否使用Selenium（用于动态页面）
             headless (bool): 是否使用无头模式
+            use_http_cache (bool): 是否启用磁盘HTTP缓存，默认使用config.CACHE_CONFIG['enabled']
         """
         self.use_selenium = use_selenium
         self.headless = headless
         self.driver = None
-        self.session = requests.Session()
+        self.session = create_session()
         self.ua = UserAgent()
+        self.rate_limiter = get_rate_limiter()
+        # Selenium等待搜索结果超时通常是页面加载慢，也按暂时性错误重试
+        self.retry_policy = RetryPolicy.from_config(retryable_errors=(TimeoutException,))
         self.results = []
         
         # 设置请求头
@@ -58,6 +72,12 @@ class WebCrawler:
             'Upgrade-Insecure-Requests': '1',
         })
         
+        if use_http_cache is None:
+            use_http_cache = config.CACHE_CONFIG['enabled']
+        if use_http_cache:
+            install_http_cache(self.session)
+        self.fetcher = Fetcher(self.session, self.rate_limiter)
+        
         if self.use_selenium:
             self._setup_selenium()
     
@@ -80,307 +100,171 @@ class WebCrawler:
             print(f"{Fore.RED}✗ Selenium 初始化失败: {e}{Style.RESET_ALL}")
             self.use_selenium = False
     
-    def search_baidu(self, keyword, max_pages=3):
-        """百度搜索"""
-        print(f"{Fore.BLUE}正在搜索百度: {keyword}{Style.RESET_ALL}")
-        results = []
+    def search_engine(self, engine_key, keyword, max_pages=3, target_results=None,
+                      deadline=None, max_bytes=None):
+        """
+        使用注册表中的搜索引擎进行搜索
         
-        for page in range(max_pages):
-            try:
-                pn = page * 10
-                url = f"https://www.baidu.com/s?wd={quote(keyword)}&pn={pn}"
-                
-                if self.use_selenium and self.driver:
-                    self.driver.get(url)
-                    time.sleep(random.uniform(2, 4))
-                    
-                    # 等待搜索结果加载
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "result"))
-                    )
-                    
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                else:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 解析搜索结果
-                search_results = soup.find_all('div', class_='result')
-                
-                for result in search_results:
-                    try:
-                        title_elem = result.find('h3')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text(strip=True)
-                        link = title_elem.find('a')['href'] if title_elem.find('a') else ''
-                        
-                        # 获取摘要
-                        abstract_elem = result.find('div', class_='c-abstract')
-                        abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                        
-                        # 获取来源网站
-                        source_elem = result.find('div', class_='c-abstract-source')
-                        source = source_elem.get_text(strip=True) if source_elem else ''
-                        
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'abstract': abstract,
-                            'source': source,
-                            'search_engine': '百度',
-                            'keyword': keyword,
-                            'page': page + 1
-                        })
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"{Fore.GREEN}第 {page + 1} 页完成，获取 {len(search_results)} 个结果{Style.RESET_ALL}")
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                print(f"{Fore.RED}百度搜索第 {page + 1} 页失败: {e}{Style.RESET_ALL}")
-                continue
+        某一页没有新结果（空页或全部重复）时提前停止翻页
         
-        return results
-    
-    def search_google(self, keyword, max_pages=3):
-        """Google搜索（需要代理）"""
-        print(f"{Fore.BLUE}正在搜索Google: {keyword}{Style.RESET_ALL}")
+        Args:
+            engine_key (str): 搜索引擎标识（config.SEARCH_ENGINES中的键）
+            keyword (str): 搜索关键词
+            max_pages (int): 最大搜索页数
+            target_results (int): 获得这么多条不重复的结果后停止，None表示不限制
+            deadline (float): 本次搜索的总耗时上限（秒），默认使用config.TASK_BUDGET_CONFIG
+            max_bytes (int): 本次搜索的总下载量上限（字节），默认使用config.TASK_BUDGET_CONFIG
+        
+        Returns:
+            list: 搜索结果（预算用完时为已经获得的部分结果）
+        """
+        engine = get_engine(engine_key)
+        if engine is None:
+            print(f"{Fore.YELLOW}不支持的搜索引擎: {engine_key}{Style.RESET_ALL}")
+            return []
+        print(f"{Fore.BLUE}正在搜索{engine.name}: {keyword}{Style.RESET_ALL}")
         results = []
-        
-        for page in range(max_pages):
-            try:
-                start = page * 10
-                url = f"https://www.google.com/search?q={quote(keyword)}&start={start}"
-                
-                if self.use_selenium and self.driver:
-                    self.driver.get(url)
-                    time.sleep(random.uniform(2, 4))
-                    
-                    # 等待搜索结果加载
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "g"))
-                    )
-                    
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                else:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 解析搜索结果
-                search_results = soup.find_all('div', class_='g')
-                
-                for result in search_results:
-                    try:
-                        title_elem = result.find('h3')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text(strip=True)
-                        link = title_elem.find('a')['href'] if title_elem.find('a') else ''
-                        
-                        # 获取摘要
-                        abstract_elem = result.find('div', class_='VwiC3b')
-                        abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                        
-                        # 获取来源网站
-                        source_elem = result.find('cite')
-                        source = source_elem.get_text(strip=True) if source_elem else ''
-                        
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'abstract': abstract,
-                            'source': source,
-                            'search_engine': 'Google',
-                            'keyword': keyword,
-                            'page': page + 1
-                        })
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"{Fore.GREEN}第 {page + 1} 页完成，获取 {len(search_results)} 个结果{Style.RESET_ALL}")
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                print(f"{Fore.RED}Google搜索第 {page + 1} 页失败: {e}{Style.RESET_ALL}")
+        retry_budget = self.retry_policy.new_budget()
+        task_budget = TaskBudget.from_config(deadline, max_bytes)
+        
+        def fetch_html(url, timeout):
+            return self.retry_policy.call(
+                lambda: self._fetch_page(url, timeout, engine.result_selector, task_budget),
+                retry_budget, self._report_retry, task_budget)
+        
+        def parse_page(html, keyword, page):
+            return run_parse(parse_search_page, engine.key, html, keyword, page)
+        
+        pages = iter_search_pages(engine, keyword, max_pages, fetch_html,
+                                  prefetch=config.CRAWLER_CONFIG['prefetch_pages'],
+                                  target_results=target_results, parse_page=parse_page)
+        for page, page_results, error in pages:
+            if isinstance(error, BudgetExhausted):
+                print(f"{Fore.YELLOW}{error}，返回已获取的 {len(results)} 个结果{Style.RESET_ALL}")
+                break
+            if error is not None:
+                print(f"{Fore.RED}{engine.name}搜索第 {page + 1} 页失败: {error}{Style.RESET_ALL}")
                 continue
+            
+            results.extend(page_results)
+            print(f"{Fore.GREEN}第 {page + 1} 页完成，获取 {len(page_results)} 个结果{Style.RESET_ALL}")
+            if not page_results and page + 1 < max_pages:
+                print(f"{Fore.YELLOW}第 {page + 1} 页没有新结果，停止翻页{Style.RESET_ALL}")
         
         return results
     
-    def search_bing(self, keyword, max_pages=3):
-        """必应搜索"""
-        print(f"{Fore.BLUE}正在搜索必应: {keyword}{Style.RESET_ALL}")
-        results = []
-        
-        for page in range(max_pages):
-            try:
-                first = page * 10
-                url = f"https://www.bing.com/search?q={quote(keyword)}&first={first}"
-                
-                if self.use_selenium and self.driver:
-                    self.driver.get(url)
-                    time.sleep(random.uniform(2, 4))
-                    
-                    # 等待搜索结果加载
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "b_algo"))
-                    )
-                    
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                else:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 解析搜索结果
-                search_results = soup.find_all('li', class_='b_algo')
-                
-                for result in search_results:
-                    try:
-                        title_elem = result.find('h3')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text(strip=True)
-                        link = title_elem.find('a')['href'] if title_elem.find('a') else ''
-                        
-                        # 获取摘要
-                        abstract_elem = result.find('p')
-                        abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                        
-                        # 获取来源网站
-                        source_elem = result.find('cite')
-                        source = source_elem.get_text(strip=True) if source_elem else ''
-                        
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'abstract': abstract,
-                            'source': source,
-                            'search_engine': '必应',
-                            'keyword': keyword,
-                            'page': page + 1
-                        })
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"{Fore.GREEN}第 {page + 1} 页完成，获取 {len(search_results)} 个结果{Style.RESET_ALL}")
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                print(f"{Fore.RED}必应搜索第 {page + 1} 页失败: {e}{Style.RESET_ALL}")
-                continue
+    def _fetch_page(self, url, timeout, wait_selector, task_budget=None):
+        """获取搜索结果页HTML（requests或Selenium）"""
+        if self.use_selenium and self.driver:
+            if task_budget is not None:
+                task_budget.check()
+            self.rate_limiter.wait(url)
+            self.driver.get(url)
+            time.sleep(random.uniform(2, 4))
+            
+            # 等待搜索结果加载
+            WebDriverWait(self.driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
+            )
+            
+            return self.driver.page_source
         
-        return results
+        return self.fetcher.fetch_page(url, budget=task_budget, timeout=timeout).text
+    
+    @staticmethod
+    def _report_retry(attempt, error, delay):
+        """打印重试信息"""
+        print(f"{Fore.YELLOW}第{attempt}次重试（{delay:.1f}秒后）: {error}{Style.RESET_ALL}")
+    
+    def search_baidu(self, keyword, max_pages=3, target_results=None):
+        """百度搜索"""
+        return self.search_engine('baidu', keyword, max_pages, target_results)
+    
+    def search_google(self, keyword, max_pages=3, target_results=None):
+        """Google搜索（需要代理）"""
+        return self.search_engine('google', keyword, max_pages, target_results)
+    
+    def search_bing(self, keyword, max_pages=3, target_results=None):
+        """必应搜索"""
+        return self.search_engine('bing', keyword, max_pages, target_results)
     
-    def search_sogou(self, keyword, max_pages=3):
+    def search_sogou(self, keyword, max_pages=3, target_results=None):
         """搜狗搜索"""
-        print(f"{Fore.BLUE}正在搜索搜狗: {keyword}{Style.RESET_ALL}")
-        results = []
-        
-        for page in range(max_pages):
-            try:
-                page_num = page + 1
-                url = f"https://www.sogou.com/web?query={quote(keyword)}&page={page_num}"
-                
-                if self.use_selenium and self.driver:
-                    self.driver.get(url)
-                    time.sleep(random.uniform(2, 4))
-                    
-                    # 等待搜索结果加载
-                    WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "vrwrap"))
-                    )
-                    
-                    soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-                else:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # 解析搜索结果
-                search_results = soup.find_all('div', class_='vrwrap')
-                
-                for result in search_results:
-                    try:
-                        title_elem = result.find('h3')
-                        if not title_elem:
-                            continue
-                            
-                        title = title_elem.get_text(strip=True)
-                        link = title_elem.find('a')['href'] if title_elem.find('a') else ''
-                        
-                        # 获取摘要
-                        abstract_elem = result.find('p', class_='txt')
-                        abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                        
-                        # 获取来源网站
-                        source_elem = result.find('cite')
-                        source = source_elem.get_text(strip=True) if source_elem else ''
-                        
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'abstract': abstract,
-                            'source': source,
-                            'search_engine': '搜狗',
-                            'keyword': keyword,
-                            'page': page + 1
-                        })
-                        
-                    except Exception as e:
-                        continue
-                
-                print(f"{Fore.GREEN}第 {page + 1} 页完成，获取 {len(search_results)} 个结果{Style.RESET_ALL}")
-                time.sleep(random.uniform(1, 3))
-                
-            except Exception as e:
-                print(f"{Fore.RED}搜狗搜索第 {page + 1} 页失败: {e}{Style.RESET_ALL}")
-                continue
-        
-        return results
+        return self.search_engine('sogou', keyword, max_pages, target_results)
     
-    def search_all_engines(self, keyword, max_pages=3, engines=None):
-        """搜索所有指定的搜索引擎"""
+    def search_all_engines(self, keyword, max_pages=3, engines=None, concurrent=False, target_results=None):
+        """
+        搜索所有指定的搜索引擎
+        
+        Args:
+            keyword (str): 搜索关键词
+            max_pages (int): 每个搜索引擎的搜索页数
+            engines (list): 搜索引擎列表
+            concurrent (bool): 是否并发搜索（每个搜索引擎在独立线程中运行，
+                各自保持请求间隔；Selenium模式下自动退回顺序搜索）
+            target_results (int): 每个搜索引擎获得这么多条不重复的结果后停止
+        
+        Returns:
+            list: 按engines顺序合并的搜索结果
+        """
         if engines is None:
             engines = ['baidu', 'bing', 'sogou']  # 默认搜索引擎
         
-        all_results = []
-        
+        supported_engines = []
         for engine in engines:
-            try:
-                if engine == 'baidu':
-                    results = self.search_baidu(keyword, max_pages)
-                elif engine == 'google':
-                    results = self.search_google(keyword, max_pages)
-                elif engine == 'bing':
-                    results = self.search_bing(keyword, max_pages)
-                elif engine == 'sogou':
-                    results = self.search_sogou(keyword, max_pages)
-                else:
-                    print(f"{Fore.YELLOW}不支持的搜索引擎: {engine}{Style.RESET_ALL}")
-                    continue
-                
-                all_results.extend(results)
-                print(f"{Fore.GREEN}✓ {engine} 搜索完成，获取 {len(results)} 个结果{Style.RESET_ALL}")
-                
-            except Exception as e:
-                print(f"{Fore.RED}✗ {engine} 搜索失败: {e}{Style.RESET_ALL}")
-                continue
+            if get_engine(engine) is None:
+                print(f"{Fore.YELLOW}不支持的搜索引擎: {engine}{Style.RESET_ALL}")
+            else:
+                supported_engines.append(engine)
+        
+        # Selenium WebDriver 不是线程安全的，只能顺序使用
+        if concurrent and self.use_selenium and self.driver:
+            print(f"{Fore.YELLOW}Selenium模式不支持并发搜索，改为顺序搜索{Style.RESET_ALL}")
+            concurrent = False
+        
+        if concurrent and len(supported_engines) > 1:
+            with ThreadPoolExecutor(max_workers=len(supported_engines)) as executor:
+                futures = [
+                    executor.submit(self._run_engine, engine, keyword, max_pages, target_results)
+                    for engine in supported_engines
+                ]
+                engine_results = [future.result() for future in futures]
+        else:
+            engine_results = [
+                self._run_engine(engine, keyword, max_pages, target_results)
+                for engine in supported_engines
+            ]
+        
+        all_results = []
+        for results in engine_results:
+            all_results.extend(results)
         
         return all_results
     
+    def _run_engine(self, engine, keyword, max_pages, target_results=None):
+        """运行单个搜索引擎，失败时返回空列表"""
+        try:
+            results = self.search_engine(engine, keyword, max_pages, target_results)
+            print(f"{Fore.GREEN}✓ {engine} 搜索完成，获取 {len(results)} 个结果{Style.RESET_ALL}")
+            return results
+            
+        except Exception as e:
+            print(f"{Fore.RED}✗ {engine} 搜索失败: {e}{Style.RESET_ALL}")
+            return []
+    
     def save_results(self, results, filename=None, format='excel'):
-        """保存搜索结果"""
-        if not results:
+        """
+        保存搜索结果
+        
+        csv和jsonl格式逐条流式写入（results可以是生成器），按config.OUTPUT_CONFIG定期刷新、
+        超过大小上限时自动分卷；excel和json格式需要先收集全部结果
+        
+        Args:
+            results (iterable): 搜索结果
+            filename (str): 文件名（不含扩展名），默认按时间生成
+            format (str): 'excel'、'csv'、'json' 或 'jsonl'
+        """
+        if isinstance(results, list) and not results:
             print(f"{Fore.YELLOW}没有结果可保存{Style.RESET_ALL}")
             return
         
@@ -389,22 +273,23 @@ class WebCrawler:
             filename = f"search_results_{timestamp}"
         
         try:
-            df = pd.DataFrame(results)
-            
-            if format.lower() == 'excel':
-                filepath = f"{filename}.xlsx"
-                df.to_excel(filepath, index=False, engine='openpyxl')
-                print(f"{Fore.GREEN}✓ 结果已保存到: {filepath}{Style.RESET_ALL}")
+            if format.lower() in ('csv', 'jsonl'):
+                with open_writer(filename, format) as writer:
+                    writer.write_all(results)
+                if writer.count == 0:
+                    print(f"{Fore.YELLOW}没有结果可保存{Style.RESET_ALL}")
+                    return
+                print(f"{Fore.GREEN}✓ 结果已保存到: {', '.join(writer.paths)}（共 {writer.count} 条）{Style.RESET_ALL}")
                 
-            elif format.lower() == 'csv':
-                filepath = f"{filename}.csv"
-                df.to_csv(filepath, index=False, encoding='utf-8-sig')
+            elif format.lower() == 'excel':
+                filepath = f"{filename}.xlsx"
+                pd.DataFrame(results).to_excel(filepath, index=False, engine='openpyxl')
                 print(f"{Fore.GREEN}✓ 结果已保存到: {filepath}{Style.RESET_ALL}")
                 
             elif format.lower() == 'json':
                 filepath = f"{filename}.json"
                 with open(filepath, 'w', encoding='utf-8') as f:
-                    json.dump(results, f, ensure_ascii=False, indent=2)
+                    json.dump(list(results), f, ensure_ascii=False, indent=2)
                 print(f"{Fore.GREEN}✓ 结果已保存到: {filepath}{Style.RESET_ALL}")
                 
             else:
@@ -439,13 +324,28 @@ class WebCrawler:
             print(f"   来源: {result.get('source', '未知')}")
             print(f"   搜索引擎: {result.get('search_engine', '未知')}")
             print(f"   摘要: {result.get('abstract', '无摘要')[:100]}...")
+        
+        self.print_host_stats()
+    
+    def print_host_stats(self):
+        """打印各主机的自适应并发状态和熔断状态"""
+        host_stats = self.fetcher.stats()
+        open_hosts = self.fetcher.open_hosts()
+        if not host_stats and not open_hosts:
+            return
+        
+        print(f"\n{Fore.YELLOW}主机并发状态:{Style.RESET_ALL}")
+        for host, stats in host_stats.items():
+            latency = f"{stats['latency_ms']} ms" if stats['latency_ms'] is not None else '未知'
+            print(f"  {host}: 并发上限 {stats['limit']}，平均延迟 {latency}，降低次数 {stats['decreases']}")
+        for host, retry_in in open_hosts.items():
+            print(f"  {host}: 已熔断，{retry_in:.0f} 秒后再尝试")
     
     def close(self):
         """关闭爬虫，释放资源"""
         if self.driver:
             self.driver.quit()
-        if self.session:
-            self.session.close()
+        # Session的连接池在所有爬虫实例之间共享，这里不关闭，空闲连接留给其他任务复用
         print(f"{Fore.GREEN}✓ 爬虫已关闭，资源已释放{Style.RESET_ALL}")
 
 
@@ -502,8 +402,8 @@ def main():
         if results:
             save_choice = input(f"\n{Fore.YELLOW}是否保存结果? (y/n, 默认y): {Style.RESET_ALL}").strip().lower()
             if save_choice != 'n':
-                format_choice = input(f"{Fore.YELLOW}选择保存格式 (excel/csv/json, 默认excel): {Style.RESET_ALL}").strip().lower()
-                format_choice = format_choice if format_choice in ['excel', 'csv', 'json'] else 'excel'
+                format_choice = input(f"{Fore.YELLOW}选择保存格式 (excel/csv/json/jsonl, 默认excel): {Style.RESET_ALL}").strip().lower()
+                format_choice = format_choice if format_choice in ['excel', 'csv', 'json', 'jsonl'] else 'excel'
                 
                 filename = f"search_{keyword}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
                 crawler.save_results(results, filename, format_choice)